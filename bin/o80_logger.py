@@ -4,10 +4,10 @@ import sys
 import time
 import signal_handler
 import o80_pam
-from lightargs import BrightArgs,FileExists
+from lightargs import BrightArgs,FileExists,Set
 
 
-def _log(segment_id,file_path,frequency,duration):
+def _log(segment_id,file_path,frequency,duration,buffered,segment_duration,compression):
     # for exit on ctrl+c
     signal_handler.init()
     time_start = time.time()
@@ -15,7 +15,10 @@ def _log(segment_id,file_path,frequency,duration):
     # starts to log
     with o80_pam.Logger(segment_id,
                         file_path,
-                        frequency):
+                        frequency,
+                        buffered=buffered,
+                        segment_duration=segment_duration,
+                        compression=compression) as logger:
         # monitoring for ctrl+c
         while not signal_handler.has_received_sigint():
             time.sleep(0.1)
@@ -23,6 +26,10 @@ def _log(segment_id,file_path,frequency,duration):
             if duration > 0:
                 if time.time()-time_start>duration:
                     break
+    stats = logger.stats()
+    print("observations written: {}".format(stats["observations"]))
+    print("missed iterations: {}".format(stats["missed_iterations"]))
+    print("write throughput: {:.2f} MB/s".format(stats["write_throughput"]*1e-6))
     
 
 def _configure():
@@ -49,6 +56,22 @@ def _configure():
                       -1,
                       "duration of record (in sec). if negative, infinite record time",
                       int)
+    # writing all observations collected during an iteration
+    # in one call, and flushing only periodically
+    config.add_operation("buffered",
+                         "buffered writes (one write per collection iteration)")
+    # for long recording: splitting the log into several files
+    config.add_option("segment_duration",
+                      -1,
+                      "a new file is started every segment_duration seconds. "
+                      "if negative, a single file is written",
+                      int)
+    # compressing the log file (blocks of observations)
+    config.add_option("compression",
+                      "none",
+                      "compression codec: none, zlib or lzma",
+                      str,
+                      integrity_checks=[Set("none","zlib","lzma")])
     change_all=False
     finished = config.dialog(change_all,sys.argv[1:])
     if not finished:
@@ -63,7 +86,10 @@ def execute():
     _log(config.segment_id,
          config.file_path,
          config.frequency,
-         config.duration)
+         config.duration,
+         config.buffered,
+         config.segment_duration if config.segment_duration > 0 else None,
+         config.compression if config.compression != "none" else None)
     
 if __name__ == "__main__":
     execute()
@@ -13,6 +13,7 @@ import sys
 import typing
 from pathlib import Path
 import lightargs
+import numpy as np
 import o80
 import o80_pam
 import pam_mujoco
@@ -151,14 +152,15 @@ def _set_robot_commands(
     Buffer all the commands required to replay the robot's joint trajetories
     encoded by the steps.
     """
-    for step1, step2 in zip(steps, steps[1:]):
-        robot = step2[2]
-        robot_frontend.add_command(
-            robot.position,
-            robot.velocity,
-            o80.Duration_us.nanoseconds(step2[0] - step1[0]),
-            o80.Mode.QUEUE,
-        )
+    if len(steps) < 2:
+        return
+    # all the waypoints are queued with a single call
+    positions = np.array([step[2].position for step in steps[1:]])
+    velocities = np.array([step[2].velocity for step in steps[1:]])
+    durations_us = (
+        np.diff(np.array([step[0] for step in steps], dtype=np.int64)) // 1000
+    )
+    robot_frontend.add_commands(positions, velocities, durations_us, o80.Mode.QUEUE)
 
 
 def _replay(
@@ -1,18 +1,64 @@
+import importlib
 from o80_pam_wrp import *
 
-from .o80_ball import o80Ball
-from .o80_hit_point import o80HitPoint
-from .o80_goal import o80Goal
 from .o80_pressures import o80Pressures
 from .o80_robot_mirroring import o80RobotMirroring
-from .position_control import PositionController
-from .mirroring import start_mirroring, stop_mirroring
 from .segment_ids import segment_ids
 from .mujoco_id import mujoco_id
-from .logger import Logger, read_file, FileManager
-from .run_robot import run, run_dummy_robot
-from . import robot_ball_parser
-from . import observation_convertors
+
+# The submodules below (and their dependencies, e.g. pandas, context,
+# lightargs, pam_interface, or asyncio and multiprocessing for the
+# loggers) are imported only when first used (see __getattr__), so
+# that "import o80_pam" remains fast. numpy is not listed, as it is
+# imported by the bindings (o80_pam_wrp) anyway.
+
+_lazy_attributes = {
+    "Logger": "logger",
+    "FileManager": "logger",
+    "fire_trigger": "logger",
+    "read_file": "logger",
+    "aread_file": "logger",
+    "read_range": "logger",
+    "read_time_window": "logger",
+    "list_segments": "logger",
+    "read_file_mmap": "log_columnar",
+    "MultiLogger": "multi_logger",
+    "read_multi_file": "multi_logger",
+    "read_passes": "multi_logger",
+    "o80Ball": "o80_ball",
+    "o80HitPoint": "o80_hit_point",
+    "o80Goal": "o80_goal",
+    "PositionController": "position_control",
+    "start_mirroring": "mirroring",
+    "stop_mirroring": "mirroring",
+    "ObservationView": "observation_view",
+    "read_file_views": "observation_view",
+    "run": "run_robot",
+    "run_dummy_robot": "run_robot",
+}
+"""
+attribute of the package: submodule it is imported from
+"""
+
+_lazy_submodules = ("robot_ball_parser", "observation_convertors", "aio")
+
+
+def __getattr__(name):
+    # called only for attributes which have not been imported yet
+    if name in _lazy_attributes:
+        module = importlib.import_module("." + _lazy_attributes[name], __name__)
+        value = getattr(module, name)
+    elif name in _lazy_submodules:
+        value = importlib.import_module("." + name, __name__)
+    else:
+        raise AttributeError("module {} has no attribute {}".format(__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_attributes) | set(_lazy_submodules))
+
 
 BallFrontEnd = MirrorFreeJointFrontEnd
 GoalFrontEnd = MirrorFreeJointFrontEnd
@@ -0,0 +1,130 @@
+import asyncio
+import functools
+import typing
+from concurrent.futures import ThreadPoolExecutor
+import o80_pam
+
+# asyncio wrappers over the o80 frontends. The blocking calls are
+# run by a thread dedicated to the frontend (the GIL being released
+# by the bindings while blocking), so that the event loop keeps running.
+
+
+class _AsyncFrontEnd:
+    """
+    Base class of the asyncio wrappers over o80 frontends.
+    The methods which may block (pulse_and_wait, wait_for_next, burst,
+    latest and the others listed in _blocking) are coroutines,
+    run by a single thread dedicated to the frontend, i.e. the calls
+    are executed one at a time, in order. All the other methods of
+    the frontend (e.g. add_command) are available as is (non blocking).
+    Commands should not be added while a coroutine of the same instance
+    is pending. Can be used as an (asynchronous) context manager.
+
+    Args:
+        segment_id: segment_id of the o80 backend
+        frontend: if not None, the frontend to wrap (segment_id is
+          then ignored)
+        frontend_class: if not None, class of the frontend to create
+          (e.g. o80_pam.FrontEnd_small for backends using a small queue),
+          instead of the default size class
+    """
+
+    _frontend_class: typing.Callable[[str], typing.Any]
+    _blocking = (
+        "pulse",
+        "final_burst",
+        "read",
+        "get_observations_since",
+        "get_latest_observations",
+        "get_observations_since_array",
+        "get_latest_observations_array",
+    )
+
+    def __init__(
+        self,
+        segment_id: str,
+        frontend: typing.Any = None,
+        frontend_class: typing.Optional[typing.Callable[[str], typing.Any]] = None,
+    ):
+        if frontend is None:
+            if frontend_class is None:
+                frontend_class = type(self)._frontend_class
+            frontend = frontend_class(segment_id)
+        self._frontend = frontend
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="o80_pam_aio_{}".format(segment_id)
+        )
+
+    @property
+    def frontend(self) -> typing.Any:
+        """
+        the wrapped (synchronous) frontend
+        """
+        return self._frontend
+
+    async def _run(self, method: str, *args) -> typing.Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(getattr(self._frontend, method), *args)
+        )
+
+    async def pulse_and_wait(self) -> typing.Any:
+        return await self._run("pulse_and_wait")
+
+    async def wait_for_next(self) -> typing.Any:
+        return await self._run("wait_for_next")
+
+    async def burst(self, nb_iterations: int) -> typing.Any:
+        return await self._run("burst", nb_iterations)
+
+    async def latest(self) -> typing.Any:
+        return await self._run("latest")
+
+    def __getattr__(self, name: str) -> typing.Any:
+        # called only for attributes not found on the instance
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name in type(self)._blocking:
+            return functools.partial(self._run, name)
+        return getattr(self._frontend, name)
+
+    def close(self) -> None:
+        """
+        Stops the thread running the blocking calls (after
+        completion of the pending calls)
+        """
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> "_AsyncFrontEnd":
+        return self
+
+    async def __aexit__(self, _, __, ___) -> None:
+        # waiting for the pending calls (e.g. wait_for_next) in another
+        # thread, so that the event loop is not blocked
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+class FrontEnd(_AsyncFrontEnd):
+    """
+    asyncio wrapper over o80_pam.FrontEnd, e.g.
+    ``observation = await frontend.pulse_and_wait()``
+    (see _AsyncFrontEnd)
+    """
+
+    _frontend_class = o80_pam.FrontEnd
+
+
+class MirrorRobotFrontEnd(_AsyncFrontEnd):
+    """
+    asyncio wrapper over o80_pam.MirrorRobotFrontEnd (see _AsyncFrontEnd)
+    """
+
+    _frontend_class = o80_pam.MirrorRobotFrontEnd
+
+
+class MirrorFreeJointFrontEnd(_AsyncFrontEnd):
+    """
+    asyncio wrapper over o80_pam.MirrorFreeJointFrontEnd (see _AsyncFrontEnd)
+    """
+
+    _frontend_class = o80_pam.MirrorFreeJointFrontEnd
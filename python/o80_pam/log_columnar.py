@@ -0,0 +1,119 @@
+import os
+import json
+import struct
+import typing
+import numpy as np
+import o80_pam
+
+# Columnar log files (see Logger, file_format="columnar") consist of:
+# - the magic bytes below
+# - the size (in bytes, uint32) of the complete header (magic included)
+# - a json string describing the numpy structured dtype of the records
+# - padding up to a multiple of _ALIGNMENT bytes
+# - fixed-width records, one per observation
+
+_MAGIC = b"O80PAMC1"
+_VERSION = 1
+_ALIGNMENT = 64
+
+record_dtype = np.dtype(
+    [
+        ("iteration", np.int64),
+        ("time_stamp", np.int64),
+        ("frequency", np.float64),
+        ("positions", np.float64, (4,)),
+        ("velocities", np.float64, (4,)),
+        ("desired_pressures", np.int32, (8,)),
+        ("observed_pressures", np.int32, (8,)),
+        ("references_found", np.bool_, (4,)),
+    ]
+)
+"""
+numpy structured dtype of the records of a columnar log file.
+Pressures are ordered agonist / antagonist for each degree of freedom.
+"""
+
+
+def header(dtype: np.dtype = record_dtype) -> bytes:
+    """
+    Returns the header to write at the beginning of a columnar log file
+    which records are of the provided dtype.
+    """
+    description = json.dumps({"version": _VERSION, "descr": dtype.descr}).encode()
+    size = len(_MAGIC) + 4 + len(description)
+    size += (-size) % _ALIGNMENT
+    padding = b" " * (size - len(_MAGIC) - 4 - len(description))
+    return _MAGIC + struct.pack("<I", size) + description + padding
+
+
+def _descr_to_dtype(descr: typing.List[list]) -> np.dtype:
+    # json casts the tuples of a dtype descr to lists (and the shapes
+    # of subarrays to lists as well)
+    fields = []
+    for field in descr:
+        if len(field) == 3:
+            fields.append((field[0], field[1], tuple(field[2])))
+        else:
+            fields.append((field[0], field[1]))
+    return np.dtype(fields)
+
+
+def read_header(file_path: str) -> typing.Tuple[np.dtype, int]:
+    """
+    Returns the dtype of the records of the columnar log file
+    and the size of its header (i.e. the offset of the first record).
+
+    :raises :py:class:`ValueError`: if the file is not a columnar log file
+    """
+    with open(file_path, "rb") as f:
+        start = f.read(len(_MAGIC) + 4)
+        if len(start) < len(_MAGIC) + 4 or start[: len(_MAGIC)] != _MAGIC:
+            raise ValueError("{} is not a columnar log file".format(file_path))
+        (size,) = struct.unpack("<I", start[len(_MAGIC) :])
+        description = json.loads(f.read(size - len(start)).decode())
+    return _descr_to_dtype(description["descr"]), size
+
+
+def is_columnar(file_path: str) -> bool:
+    """
+    Returns True if the file starts with a columnar log file header.
+    """
+    with open(file_path, "rb") as f:
+        return f.read(len(_MAGIC)) == _MAGIC
+
+
+def observations_to_records(
+    observations: typing.Sequence[o80_pam.Observation],
+) -> np.ndarray:
+    """
+    Cast the observations to a numpy array of dtype record_dtype
+    (see o80_pam.observations_to_records).
+    """
+    return o80_pam.observations_to_records(list(observations))
+
+
+def read_file_mmap(file_path: str) -> np.ndarray:
+    """
+    Returns a read only memory mapped view over the records of a columnar
+    log file (i.e. a file written by an instance of Logger with
+    file_format="columnar"). The data is not loaded into memory: it is
+    read from the disk only when (and if) accessed, e.g.
+    read_file_mmap(path)["positions"][-1000:].
+    An incomplete record at the end of the file (e.g. the file is still
+    being written) is ignored.
+
+    :param str file_path: path to the file to read
+    :raises :py:class:`FileNotFoundError`: if the the file does not exists
+    :raises :py:class:`ValueError`: if the file is not a columnar log file
+    :returns: numpy array (memmap) of structured records
+    """
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError("failed to find {}".format(file_path))
+    dtype, offset = read_header(file_path)
+    nb_records = (os.path.getsize(file_path) - offset) // dtype.itemsize
+    if nb_records == 0:
+        # an empty file can not be memory mapped
+        return np.empty(0, dtype=dtype)
+    return np.memmap(
+        file_path, dtype=dtype, mode="r", offset=offset, shape=(nb_records,)
+    )
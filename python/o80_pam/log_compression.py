@@ -0,0 +1,181 @@
+import os
+import lzma
+import zlib
+import struct
+import typing
+import o80_pam
+
+# Compressed log files (see Logger, compression="zlib" or "lzma") consist of:
+# - a header: magic bytes, name of the codec (8 bytes) and size
+#   of a serialized observation (uint32)
+# - blocks, each consisting of a block header (size of the compressed
+#   payload, number of observations, iteration and time stamp of the first
+#   observation) followed by the compressed serialized observations
+# - an index of the blocks (written when the file is closed), followed by
+#   its offset, the number of blocks and the index magic bytes.
+# If the index is missing (e.g. the logger process has been killed),
+# it is rebuilt by reading the block headers.
+
+_MAGIC = b"O80PAMZ1"
+_INDEX_MAGIC = b"O80PAMZI"
+_HEADER = struct.Struct("<8s8sI")
+_BLOCK_HEADER = struct.Struct("<IIqq")
+_INDEX_ENTRY = struct.Struct("<QIqq")
+_FOOTER = struct.Struct("<QI8s")
+
+codecs = {
+    "zlib": (zlib.compress, zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+"""
+supported compression codecs: name -> (compress, decompress)
+"""
+
+
+class Block(typing.NamedTuple):
+    """
+    Entry of the index of a compressed log file
+    """
+
+    offset: int  # offset of the block header in the file
+    nb_records: int
+    first_iteration: int
+    first_time_stamp: int
+
+
+def header(codec: str, record_size: int) -> bytes:
+    """
+    Returns the header to write at the beginning of a compressed
+    log file.
+    """
+    return _HEADER.pack(_MAGIC, codec.encode(), record_size)
+
+
+def header_size() -> int:
+    """
+    Size of the header of compressed log files (i.e. offset of the first block)
+    """
+    return _HEADER.size
+
+
+def block(
+    codec: str,
+    serialized: typing.Sequence[bytes],
+    first_iteration: int,
+    first_time_stamp: int,
+) -> bytes:
+    """
+    Returns a block (block header + compressed payload) encoding the
+    serialized observations.
+    """
+    payload = codecs[codec][0](b"".join(serialized))
+    return (
+        _BLOCK_HEADER.pack(
+            len(payload), len(serialized), first_iteration, first_time_stamp
+        )
+        + payload
+    )
+
+
+def index(blocks: typing.Sequence[Block], offset: int) -> bytes:
+    """
+    Returns the index to write at the end of a compressed log file,
+    offset being the position of the index in the file.
+    """
+    entries = b"".join([_INDEX_ENTRY.pack(*b) for b in blocks])
+    return entries + _FOOTER.pack(offset, len(blocks), _INDEX_MAGIC)
+
+
+def is_compressed(file_path: str) -> bool:
+    """
+    Returns True if the file starts with a compressed log file header.
+    """
+    with open(file_path, "rb") as f:
+        return f.read(len(_MAGIC)) == _MAGIC
+
+
+def _read_header(f: typing.BinaryIO) -> typing.Tuple[str, int]:
+    f.seek(0)
+    magic, codec, record_size = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != _MAGIC:
+        raise ValueError("not a compressed log file")
+    return codec.rstrip(b"\0").decode(), record_size
+
+
+def _scan_blocks(f: typing.BinaryIO, file_size: int) -> typing.List[Block]:
+    # rebuilding the index from the block headers
+    blocks = []
+    offset = _HEADER.size
+    while offset + _BLOCK_HEADER.size <= file_size:
+        f.seek(offset)
+        size, nb_records, iteration, time_stamp = _BLOCK_HEADER.unpack(
+            f.read(_BLOCK_HEADER.size)
+        )
+        end = offset + _BLOCK_HEADER.size + size
+        if end > file_size:
+            # incomplete block (file still being written)
+            break
+        blocks.append(Block(offset, nb_records, iteration, time_stamp))
+        offset = end
+    return blocks
+
+
+def _read_index(f: typing.BinaryIO) -> typing.List[Block]:
+    f.seek(0, os.SEEK_END)
+    file_size = f.tell()
+    if file_size >= _HEADER.size + _FOOTER.size:
+        f.seek(file_size - _FOOTER.size)
+        offset, nb_blocks, magic = _FOOTER.unpack(f.read(_FOOTER.size))
+        if magic == _INDEX_MAGIC:
+            f.seek(offset)
+            data = f.read(nb_blocks * _INDEX_ENTRY.size)
+            return [Block(*entry) for entry in _INDEX_ENTRY.iter_unpack(data)]
+    return _scan_blocks(f, file_size)
+
+
+def read_block_index(file_path: str) -> typing.List[Block]:
+    """
+    Returns the list of blocks of a compressed log file.
+    """
+    with open(file_path, "rb") as f:
+        _read_header(f)
+        return _read_index(f)
+
+
+def _decompress(
+    f: typing.BinaryIO, decompress: typing.Callable[[bytes], bytes], block: Block
+) -> bytes:
+    f.seek(block.offset)
+    size = _BLOCK_HEADER.unpack(f.read(_BLOCK_HEADER.size))[0]
+    return decompress(f.read(size))
+
+
+def read_blocks(
+    file_path: str, first_block: int = 0
+) -> typing.Generator[bytes, None, None]:
+    """
+    Returns a generator of the decompressed blocks of a compressed
+    log file (i.e. of the concatenated serialized observations of each
+    block), starting from the block of index first_block.
+    """
+    with open(file_path, "rb") as f:
+        codec, _ = _read_header(f)
+        decompress = codecs[codec][1]
+        blocks = _read_index(f)
+        for block in blocks[first_block:]:
+            yield _decompress(f, decompress, block)
+
+
+def read_observations(
+    file_path: str, first_block: int = 0, serializer=None
+) -> typing.Generator[o80_pam.Observation, None, None]:
+    """
+    Returns a generator of the observations of a compressed log
+    file, starting from the first observation of the block of
+    index first_block. Blocks are decompressed one at a time,
+    when needed. None serializer: o80_pam.Serializer()
+    """
+    if serializer is None:
+        serializer = o80_pam.Serializer()
+    for data in read_blocks(file_path, first_block):
+        yield from serializer.deserialize_many(data)
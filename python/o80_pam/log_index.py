@@ -0,0 +1,177 @@
+import os
+import json
+import typing
+import itertools
+from . import log_columnar
+from . import log_compression
+
+# Sidecar index files: for each file written by Logger
+# (or each segment of a segmented recording), a small json
+# file (path of the log file + SUFFIX) summarizing its content.
+
+SUFFIX = ".index"
+FORMAT_VERSION = 1
+
+# number of observations read at a time by build_index
+_CHUNK_SIZE = 10000
+
+Index = typing.Dict[str, typing.Any]
+"""
+keys: format_version, file_format, nb_records, nb_gaps, first_iteration,
+last_iteration, first_time_stamp and last_time_stamp (None for files
+without records). nb_gaps is the number of times two successive records
+do not have successive iterations.
+"""
+
+
+def sidecar_path(file_path: str) -> str:
+    """
+    Returns the path of the sidecar index file of the log file
+    """
+    return file_path + SUFFIX
+
+
+class IndexBuilder:
+    """
+    Computes the index of a log file, the records being passed
+    to the update method as they are written (or read).
+    """
+
+    def __init__(self, file_format: str):
+        self._index: Index = {
+            "format_version": FORMAT_VERSION,
+            "file_format": file_format,
+            "nb_records": 0,
+            "nb_gaps": 0,
+            "first_iteration": None,
+            "last_iteration": None,
+            "first_time_stamp": None,
+            "last_time_stamp": None,
+        }
+
+    def update(
+        self, iterations: typing.Sequence[int], time_stamps: typing.Sequence[int]
+    ):
+        if not iterations:
+            return
+        index = self._index
+        if index["first_iteration"] is None:
+            index["first_iteration"] = int(iterations[0])
+            index["first_time_stamp"] = int(time_stamps[0])
+        elif iterations[0] != index["last_iteration"] + 1:
+            index["nb_gaps"] += 1
+        index["nb_gaps"] += sum(
+            [1 for i1, i2 in zip(iterations, iterations[1:]) if i2 != i1 + 1]
+        )
+        index["nb_records"] += len(iterations)
+        index["last_iteration"] = int(iterations[-1])
+        index["last_time_stamp"] = int(time_stamps[-1])
+
+    def update_observations(self, observations: typing.Sequence[typing.Any]):
+        self.update(
+            [obs.get_iteration() for obs in observations],
+            [obs.get_time_stamp() for obs in observations],
+        )
+
+    def get(self) -> Index:
+        return dict(self._index)
+
+
+def write_index(file_path: str, index: Index) -> None:
+    """
+    Writes the sidecar index file of the log file
+    """
+    with open(sidecar_path(file_path), "w") as f:
+        json.dump(index, f)
+
+
+def read_index(file_path: str) -> typing.Optional[Index]:
+    """
+    Returns the content of the sidecar index file of the log file,
+    or None if there is no such file or if it is outdated
+    (i.e. older than the log file).
+    """
+    path = sidecar_path(file_path)
+    try:
+        if os.path.getmtime(path) < os.path.getmtime(file_path):
+            return None
+        with open(path, "r") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get("format_version") != FORMAT_VERSION:
+        return None
+    return index
+
+
+def build_index(file_path: str, serializer: typing.Any = None) -> Index:
+    """
+    Computes the index of the log file by reading it
+    (native, columnar or compressed file). serializer: serializer of
+    the observations of the file (native file), None for o80_pam.Serializer.
+    """
+    # imported here as these modules import the logger module
+    from .logger import read_file
+    from .observation_view import read_file_views
+
+    if log_columnar.is_columnar(file_path):
+        builder = IndexBuilder("columnar")
+        records = log_columnar.read_file_mmap(file_path)
+        builder.update(records["iteration"].tolist(), records["time_stamp"].tolist())
+        return builder.get()
+    if log_compression.is_compressed(file_path):
+        builder = IndexBuilder("compressed")
+    else:
+        builder = IndexBuilder("native")
+    if serializer is None:
+        # the views decode only the iterations and time stamps
+        observations = read_file_views(file_path, chunk_size=_CHUNK_SIZE)
+    else:
+        # e.g. file of a stream of MultiLogger logging mirroring observations
+        observations = read_file(file_path, serializer)
+    # one chunk at a time, so that the observations (and the buffers
+    # the views point to) of the complete file are not kept in memory
+    chunk = list(itertools.islice(observations, _CHUNK_SIZE))
+    while chunk:
+        builder.update_observations(chunk)
+        chunk = list(itertools.islice(observations, _CHUNK_SIZE))
+    return builder.get()
+
+
+def get_index(file_path: str, serializer: typing.Any = None) -> Index:
+    """
+    Returns the index of the log file, read from its sidecar
+    index file. If missing or outdated, the index is built
+    from the content of the log file (see build_index) and the
+    sidecar index file is (re)written.
+    """
+    index = read_index(file_path)
+    if index is None:
+        index = build_index(file_path, serializer)
+        try:
+            write_index(file_path, index)
+        except OSError:
+            # e.g. read only folder
+            pass
+    return index
+
+
+def merge(indexes: typing.Sequence[Index]) -> Index:
+    """
+    Returns the index of a segmented recording, given the
+    (ordered) indexes of its segments.
+    """
+    merged = IndexBuilder(indexes[0]["file_format"] if indexes else "native").get()
+    for index in indexes:
+        if index["nb_records"] == 0:
+            continue
+        if merged["first_iteration"] is None:
+            merged["first_iteration"] = index["first_iteration"]
+            merged["first_time_stamp"] = index["first_time_stamp"]
+        elif index["first_iteration"] != merged["last_iteration"] + 1:
+            merged["nb_gaps"] += 1
+        merged["nb_gaps"] += index["nb_gaps"]
+        merged["nb_records"] += index["nb_records"]
+        merged["last_iteration"] = index["last_iteration"]
+        merged["last_time_stamp"] = index["last_time_stamp"]
+    return merged
@@ -1,10 +1,21 @@
 import os
-from multiprocessing import Process
+import re
+import asyncio
+import bisect
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+from multiprocessing import Process, Array
+from collections import deque
 from datetime import datetime
 import o80
 import o80_pam
 import shared_memory
 import copy
+from . import log_columnar
+from . import log_compression
+from . import log_index
 
 
 def _set_start(segment_id, logger_id):
@@ -19,12 +30,596 @@ def _should_stop(segment_id, logger_id):
     return not shared_memory.get_bool(segment_id, logger_id)
 
 
+def _trigger_key(logger_id):
+    return "{}_trigger".format(logger_id)
+
+
+def fire_trigger(segment_id, trigger_id):
+    """
+    fires the trigger of a Logger running in trigger capture mode
+    (see the pre_trigger argument of Logger), possibly from
+    another process.
+    :param str segment_id: segment_id of the backend logged by the Logger
+    :param str trigger_id: see Logger.trigger_id
+    """
+    shared_memory.set_bool(segment_id, trigger_id, True)
+
+
+def _consume_trigger(segment_id, trigger_id):
+    # returns True if the trigger has been fired since the last call
+    if shared_memory.get_bool(segment_id, trigger_id):
+        shared_memory.set_bool(segment_id, trigger_id, False)
+        return True
+    return False
+
+
+@dataclass
+class _LogConfig:
+    # configuration of the logging process (see Logger)
+    segment_id: str
+    file_path: str
+    frequency: float
+    logger_id: str
+    buffered: bool = False
+    flush_period: float = 1.0
+    flush_bytes: int = 4 * 1024 * 1024
+    file_format: str = "native"
+    segment_size: Optional[int] = None
+    segment_duration: Optional[float] = None
+    compression: Optional[str] = None
+    block_size: int = 1000
+    threaded: bool = False
+    ring_size: int = 100000
+    pre_trigger: Optional[float] = None
+    post_trigger: float = 1.0
+    trigger: Optional[Callable[..., bool]] = None
+    trigger_id: Optional[str] = None
+    frontend: str = "FrontEnd"
+
+
+_frontends = ("FrontEnd", "FrontEnd_small")
+"""
+name of the frontend classes that can be used by Logger
+"""
+
+
+class _LoggerStats:
+
+    # counters written by the logging process and read by the
+    # Logger instance (parent process). They are hosted by a
+    # shared memory array, so they are available live, while
+    # the logging process is running.
+
+    fields = (
+        "observations",  # number of observations written
+        "bytes",  # number of bytes written
+        "write_duration",  # time spent in write / flush calls (seconds)
+        "missed_iterations",  # iterations of the backend not written
+        "lag",  # latest iteration of the backend - latest iteration written
+        "write_latency_p50",  # percentiles of the duration of write calls
+        "write_latency_p90",  # (seconds), over the latest _nb_latencies calls
+        "write_latency_p99",
+        "write_latency_max",
+        "dropped",  # observations dropped because the ring was full (threaded)
+        "backpressure",  # collections which found the ring half full (threaded)
+        "ring_filling",  # filling of the ring (0 to 1) (threaded)
+        "triggers",  # number of captures (trigger mode)
+    )
+
+    _nb_latencies = 1000
+    _latencies_update = 50
+
+    def __init__(self):
+        self._values = Array("d", len(self.fields))
+        # local to the logging process
+        self._latencies = deque(maxlen=self._nb_latencies)
+        self._nb_writes = 0
+
+    def _add(self, field, value):
+        self._values[self.fields.index(field)] += value
+
+    def _set(self, field, value):
+        self._values[self.fields.index(field)] = value
+
+    def add(self, nb_bytes, duration):
+        # nb_bytes written (or flushed, if nb_bytes is 0) in duration seconds
+        with self._values.get_lock():
+            self._add("bytes", nb_bytes)
+            self._add("write_duration", duration)
+        if nb_bytes == 0:
+            return
+        self._latencies.append(duration)
+        self._nb_writes += 1
+        # sorting the latencies is not free, so percentiles are
+        # updated only every _latencies_update write calls
+        if self._nb_writes % self._latencies_update == 1:
+            latencies = sorted(self._latencies)
+            with self._values.get_lock():
+                for percentile in (50, 90, 99):
+                    index = int(round((len(latencies) - 1) * percentile / 100.0))
+                    self._set("write_latency_p{}".format(percentile), latencies[index])
+                self._set("write_latency_max", latencies[-1])
+
+    def add_observations(self, nb_observations, missed_iterations, lag):
+        with self._values.get_lock():
+            self._add("observations", nb_observations)
+            self._add("missed_iterations", missed_iterations)
+            self._set("lag", lag)
+
+    def add_missed(self, missed_iterations):
+        with self._values.get_lock():
+            self._add("missed_iterations", missed_iterations)
+
+    def add_ring(self, dropped, backpressure, filling):
+        with self._values.get_lock():
+            self._add("dropped", dropped)
+            self._add("backpressure", int(backpressure))
+            self._set("ring_filling", filling)
+
+    def add_trigger(self):
+        with self._values.get_lock():
+            self._add("triggers", 1)
+
+    def throughput(self):
+        # bytes per second spent in write (and flush) calls
+        duration = self._values[self.fields.index("write_duration")]
+        if duration <= 0:
+            return 0.0
+        return self._values[self.fields.index("bytes")] / duration
+
+    def get(self):
+        with self._values.get_lock():
+            values = list(self._values)
+        stats = dict(zip(self.fields, values))
+        for field in (
+            "observations",
+            "bytes",
+            "missed_iterations",
+            "lag",
+            "dropped",
+            "backpressure",
+            "triggers",
+        ):
+            stats[field] = int(stats[field])
+        stats["write_throughput"] = self.throughput()
+        return stats
+
+
+def _missed_iterations(latest, observations):
+    # number of iterations of the backend, between latest (the iteration
+    # of the latest observation written) and the last of the newly
+    # collected observations, which are missing from these observations
+    if latest is None:
+        return 0
+    return observations[-1].get_iteration() - latest - len(observations)
+
+
+class _NativeFormat:
+
+    # each observation is written as serialized by o80_pam.Serializer
+    # (files read by read_file)
+
+    index_format = "native"
+
+    def __init__(self, serializer=None):
+        if serializer is None:
+            serializer = o80_pam.Serializer()
+        self._serializer = serializer
+
+    def header(self):
+        return b""
+
+    def encode(self, observations):
+        return [self._serializer.serialize_many(observations)]
+
+    def finish(self):
+        return []
+
+
+class _ColumnarFormat:
+
+    # each observation is written as a fixed width numpy record
+    # (files read by read_file_mmap)
+
+    index_format = "columnar"
+
+    def header(self):
+        return log_columnar.header()
+
+    def encode(self, observations):
+        return [o80_pam.observations_to_records(observations).tobytes()]
+
+    def finish(self):
+        return []
+
+
+class _CompressedFormat:
+
+    # observations are serialized as for the native format, but
+    # written in compressed blocks of block_size observations,
+    # followed by an index of the blocks (files read by read_file)
+
+    index_format = "compressed"
+
+    def __init__(self, codec, block_size):
+        self._serializer = o80_pam.Serializer()
+        self._codec = codec
+        self._block_size = block_size
+
+    def header(self):
+        # (re)starting a file
+        self._pending = []
+        self._first = None
+        self._blocks = []
+        self._offset = log_compression.header_size()
+        return log_compression.header(
+            self._codec, o80_pam.Serializer.serializable_size()
+        )
+
+    def _block(self):
+        block = log_compression.block(self._codec, self._pending, *self._first)
+        self._blocks.append(
+            log_compression.Block(self._offset, len(self._pending), *self._first)
+        )
+        self._offset += len(block)
+        self._pending = []
+        return block
+
+    def encode(self, observations):
+        blocks = []
+        for obs in observations:
+            if not self._pending:
+                self._first = (obs.get_iteration(), obs.get_time_stamp())
+            self._pending.append(self._serializer.serialize(obs))
+            if len(self._pending) >= self._block_size:
+                blocks.append(self._block())
+        return blocks
+
+    def finish(self):
+        # last (incomplete) block and index
+        chunks = [self._block()] if self._pending else []
+        chunks.append(log_compression.index(self._blocks, self._offset))
+        return chunks
+
+
+_formats = {"native": _NativeFormat, "columnar": _ColumnarFormat}
+
+
+def segment_path(file_path, index):
+    """
+    returns the path of the segment of the given index of a
+    recording split in several files (see the segment_size
+    and segment_duration arguments of Logger)
+    """
+    return "{}.{:05d}".format(file_path, index)
+
+
+_segment_pattern = re.compile(r"^(.*)\.(\d{5})$")
+_segment_suffix = re.compile(r"^\.\d{5}$")
+
+
+def list_segments(file_path):
+    """
+    returns the ordered list of the paths of the segments of a recording
+    split in several files (see the segment_size and segment_duration
+    arguments of Logger). Returns an empty list if the recording
+    has not been split.
+    """
+    folder = os.path.dirname(file_path) or os.curdir
+    filename = os.path.basename(file_path)
+    segments = []
+    for f in os.listdir(folder):
+        match = _segment_pattern.match(f)
+        if match and match.group(1) == filename:
+            segments.append((int(match.group(2)), os.path.join(folder, f)))
+    return [path for _, path in sorted(segments)]
+
+
+class _Output:
+
+    # writes encoded observations into the log file, either
+    # chunk per chunk, flushing after each of them (i.e. one
+    # write and one flush per pass of the logging loop, as
+    # the native and columnar formats encode the observations
+    # of a pass in a single chunk), or one buffer per pass of
+    # the logging loop (flushing periodically or after a given
+    # amount of bytes).
+    # If a segment size or duration is configured, the
+    # observations are written in successive files
+    # (see segment_path), a new one being opened once the
+    # current one is big (or old) enough.
+    # For formats of observations of o80_pam.FrontEnd (i.e.
+    # with an index_format attribute), a sidecar index
+    # (see log_index) is written next to each file when closed.
+
+    def __init__(self, config, stats, file_format):
+        self._config = config
+        self._stats = stats
+        self._format = file_format
+        self._index_format = getattr(file_format, "index_format", None)
+        self._segmented = (
+            config.segment_size is not None or config.segment_duration is not None
+        )
+        self._segment_index = 0
+        self._f = None
+        self._open()
+
+    def _open(self):
+        if self._segmented:
+            path = segment_path(self._config.file_path, self._segment_index)
+        else:
+            path = self._config.file_path
+        self._path = path
+        self._f = open(path, "wb+")
+        if self._index_format is not None:
+            self._index = log_index.IndexBuilder(self._index_format)
+        self._segment_bytes = 0
+        self._segment_start = time.monotonic()
+        self._unflushed = 0
+        self._last_flush = time.perf_counter()
+        self._write([self._format.header()])
+
+    def _should_rotate(self):
+        if not self._segmented:
+            return False
+        if (
+            self._config.segment_size is not None
+            and self._segment_bytes >= self._config.segment_size
+        ):
+            return True
+        if (
+            self._config.segment_duration is not None
+            and time.monotonic() - self._segment_start >= self._config.segment_duration
+        ):
+            return True
+        return False
+
+    def _write_each(self, chunks):
+        nb_bytes = 0
+        start = time.perf_counter()
+        for chunk in chunks:
+            self._f.write(chunk)
+            self._f.flush()
+            nb_bytes += len(chunk)
+        self._segment_bytes += nb_bytes
+        self._stats.add(nb_bytes, time.perf_counter() - start)
+
+    def _flush(self):
+        self._f.flush()
+        self._unflushed = 0
+        self._last_flush = time.perf_counter()
+
+    def _write_buffer(self, chunks):
+        buffer = b"".join(chunks)
+        start = time.perf_counter()
+        self._f.write(buffer)
+        self._unflushed += len(buffer)
+        if (
+            self._unflushed >= self._config.flush_bytes
+            or start - self._last_flush >= self._config.flush_period
+        ):
+            self._flush()
+        self._segment_bytes += len(buffer)
+        self._stats.add(len(buffer), time.perf_counter() - start)
+
+    def flush_if_due(self):
+        # to be called on each pass of the logging loop, so that
+        # buffered bytes are flushed after flush_period seconds
+        # even if no new observation is written (e.g. idle backend)
+        if (
+            self._unflushed
+            and time.perf_counter() - self._last_flush >= self._config.flush_period
+        ):
+            start = time.perf_counter()
+            self._flush()
+            self._stats.add(0, time.perf_counter() - start)
+
+    def _write(self, chunks):
+        if self._config.buffered:
+            self._write_buffer(chunks)
+        else:
+            self._write_each(chunks)
+
+    def write(self, observations):
+        if self._index_format is not None:
+            self._index.update_observations(observations)
+        self._write(self._format.encode(observations))
+        # rotation occurs only between two calls to write, i.e.
+        # no observation is split between two segments
+        if self._should_rotate():
+            self.close()
+            self._segment_index += 1
+            self._open()
+
+    def close(self):
+        self._write(self._format.finish())
+        start = time.perf_counter()
+        self._f.close()
+        self._stats.add(0, time.perf_counter() - start)
+        if self._index_format is not None:
+            log_index.write_index(self._path, self._index.get())
+
+
+def _collect(frontend, latest):
+    # returns all new observations written by the backend since
+    # the observation of iteration latest (or the latest observation
+    # if latest is None, i.e. first call)
+    if latest is None:
+        return [frontend.latest()]
+    return frontend.get_observations_since(latest + 1)
+
+
+class _Ring:
+
+    # bounded buffer of observations between the thread collecting
+    # them and the thread writing them (see _log_threaded). If full,
+    # the oldest observations are dropped.
+
+    def __init__(self, size):
+        self._observations = deque(maxlen=size)
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def put(self, observations):
+        # returns the number of observations dropped
+        # and the filling of the ring (0 to 1)
+        with self._condition:
+            maxlen = self._observations.maxlen
+            dropped = max(len(self._observations) + len(observations) - maxlen, 0)
+            self._observations.extend(observations)
+            filling = len(self._observations) / maxlen
+            self._condition.notify()
+        return dropped, filling
+
+    def get(self, timeout=None):
+        # waits (at most timeout seconds) for observations and returns
+        # all of them (empty list if none). Returns None once closed and empty
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._observations or self._closed, timeout
+            )
+            if self._closed and not self._observations:
+                return None
+            observations = list(self._observations)
+            self._observations.clear()
+        return observations
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+
+
 # runs a loop reading observations, serializing them,
 # and writting them in the file
-def _log(segment_id, file_path, frequency, logger_id):
+def _log_loop(config, stats, frontend, output):
+    # setting the collecting loop frequency
+    frequency_manager = o80.FrequencyManager(config.frequency)
+    latest = None
+    # any other process may stop this loop by calling
+    # _set_stop
+    while not _should_stop(config.segment_id, config.logger_id):
+        # reading all new observations written by the backend
+        # since the last pass of this loop
+        observations = _collect(frontend, latest)
+        if observations:
+            # encoding and writting all observations
+            output.write(observations)
+            missed = _missed_iterations(latest, observations)
+            # keeping track of the latest observation written
+            latest = observations[-1].get_iteration()
+            stats.add_observations(
+                len(observations),
+                missed,
+                frontend.latest().get_iteration() - latest,
+            )
+        output.flush_if_due()
+        # running at desired frequency
+        frequency_manager.wait()
+
+
+# same as _log_loop, but observations are read by a thread
+# and written by another, so that slow writes do not delay
+# the reading of the observations (which may be overwritten
+# in the o80 shared memory queue if not read on time)
+def _log_threaded(config, stats, frontend, output):
+    ring = _Ring(config.ring_size)
+    # latest iteration of the backend (frontend.latest()),
+    # as observed by the collecting thread
+    backend_latest = [None]
+
+    def _collecting():
+        frequency_manager = o80.FrequencyManager(config.frequency)
+        latest = None
+        try:
+            while not _should_stop(config.segment_id, config.logger_id):
+                observations = _collect(frontend, latest)
+                if observations:
+                    # iterations missed when reading the backend (observations
+                    # dropped by the ring are counted separately)
+                    stats.add_missed(_missed_iterations(latest, observations))
+                    latest = observations[-1].get_iteration()
+                    backend_latest[0] = frontend.latest().get_iteration()
+                    dropped, filling = ring.put(observations)
+                    stats.add_ring(dropped, filling >= 0.5, filling)
+                frequency_manager.wait()
+        finally:
+            ring.close()
+
+    collecting_thread = threading.Thread(target=_collecting)
+    collecting_thread.start()
+    latest = None
+    # the timeout: so that buffered bytes are flushed even if no
+    # new observation arrives
+    observations = ring.get(config.flush_period)
+    while observations is not None:
+        if observations:
+            output.write(observations)
+            latest = observations[-1].get_iteration()
+            stats.add_observations(len(observations), 0, backend_latest[0] - latest)
+        output.flush_if_due()
+        observations = ring.get(config.flush_period)
+    collecting_thread.join()
+
+
+# same as _log_loop, but the observations are kept in memory for
+# pre_trigger seconds and written only when the trigger fires
+# (flag set via fire_trigger or predicate returning True), followed
+# by the observations of the next post_trigger seconds. A trigger
+# firing during a capture extends it.
+def _log_trigger(config, stats, frontend, output):
+    trigger_id = config.trigger_id
+    pre_trigger = int(config.pre_trigger * 1e9)
+    post_trigger = int(config.post_trigger * 1e9)
+    frequency_manager = o80.FrequencyManager(config.frequency)
+    ring = deque()
+    # time stamp (ns) at which the current capture ends, None if armed
+    capture_end = None
+    latest = None
+    while not _should_stop(config.segment_id, config.logger_id):
+        observations = _collect(frontend, latest)
+        if not observations:
+            output.flush_if_due()
+            frequency_manager.wait()
+            continue
+        missed = _missed_iterations(latest, observations)
+        latest = observations[-1].get_iteration()
+        fired = _consume_trigger(config.segment_id, trigger_id)
+        written = []
+        for observation in observations:
+            time_stamp = observation.get_time_stamp()
+            if config.trigger is not None and config.trigger(observation):
+                fired = True
+            if fired:
+                fired = False
+                if capture_end is None:
+                    stats.add_trigger()
+                    written.extend(ring)
+                    ring.clear()
+                capture_end = time_stamp + post_trigger
+            if capture_end is not None and time_stamp > capture_end:
+                # end of the capture, re-arming
+                capture_end = None
+            if capture_end is not None:
+                written.append(observation)
+            else:
+                ring.append(observation)
+                while time_stamp - ring[0].get_time_stamp() > pre_trigger:
+                    ring.popleft()
+        if written:
+            output.write(written)
+        stats.add_observations(
+            len(written), missed, frontend.latest().get_iteration() - latest
+        )
+        output.flush_if_due()
+        frequency_manager.wait()
+
+
+def _log(config, stats):
+    segment_id = config.segment_id
     # creating an o80 frontend
     try:
-        frontend = o80_pam.FrontEnd(segment_id)
+        frontend = getattr(o80_pam, config.frontend)(segment_id)
     except:
         print(
             (
@@ -33,36 +628,25 @@ def _log(segment_id, file_path, frequency, logger_id):
             ).format(segment_id)
         )
         return
-    # serializer will compress observation instances into string
-    serializer = o80_pam.Serializer()
-    # setting the collecting loop frequency
-    frequency_manager = o80.FrequencyManager(frequency)
-    latest = None
+    # will encode observation instances into bytes
+    if config.compression is not None:
+        file_format = _CompressedFormat(config.compression, config.block_size)
+    else:
+        file_format = _formats[config.file_format]()
     # running the loop
-    with open(file_path, "wb+") as f:
-        # any other process may stop this loop by calling
-        # _set_stop
-        while not _should_stop(segment_id, logger_id):
-            if latest is None:
-                # first call
-                observations = [frontend.latest()]
-            else:
-                # reading all new observations written by the backend
-                # since the last pass of this loop
-                observations = frontend.get_observations_since(latest + 1)
-            for observation in observations:
-                # serializing and writting all observations
-                f.write(serializer.serialize(observation))
-                f.flush()
-            if observations:
-                # keeping track of the latest observation written
-                latest = observations[-1].get_iteration()
-            # running at desired frequency
-            frequency_manager.wait()
+    output = _Output(config, stats, file_format)
+    try:
+        if config.pre_trigger is not None:
+            _log_trigger(config, stats, frontend, output)
+        elif config.threaded:
+            _log_threaded(config, stats, frontend, output)
+        else:
+            _log_loop(config, stats, frontend, output)
+    finally:
+        output.close()
 
 
 class Logger:
-
     """
     Class that will spawn a process that will read the observations
     generated by an o80 backend, and writing them into a binary file.
@@ -75,10 +659,110 @@ class Logger:
     :param float frequency: collecting frequency. The collecting process will
     collect all new observations generated between two of its iteration, so this
     parameter may not be as critical as it seems.
+    :param bool buffered: if True, all the observations collected during an
+    iteration of the collecting process are written with a single call, and the
+    file is flushed only every flush_period seconds or every flush_bytes bytes.
+    If False, the observations collected during an iteration are written
+    and flushed right away: for the native and columnar formats, one write and
+    one flush per iteration (compressed format: one per completed block).
+    :param float flush_period: maximal duration (seconds) between two flushes
+    (buffered mode only)
+    :param int flush_bytes: maximal number of bytes written between two flushes
+    (buffered mode only)
+    :param str file_format: "native" (observations serialized by
+    o80_pam.Serializer, to be read via read_file) or "columnar" (fixed
+    width numpy records, to be read via read_file_mmap, not compatible with
+    segment_size and segment_duration)
+    :param int segment_size: if not None, the observations are written in
+    successive files (segments) of approximately this size (in bytes). The
+    segments are named file_path.00000, file_path.00001, etc (see list_segments)
+    and read_file(file_path) reads them all, in order.
+    :param float segment_duration: if not None, a new segment is started every
+    segment_duration seconds (may be combined with segment_size)
+    :param str compression: if not None, name of the codec ("zlib" or "lzma")
+    used to compress the observations (native format only). Observations are
+    compressed in blocks of block_size observations. Compressed files are
+    read via read_file, read_range and read_time_window.
+    :param int block_size: number of observations per compressed block
+    :param bool threaded: if True, the collecting process uses a thread
+    for reading the observations from the backend and another one for writing
+    them, so that slow writes do not delay the reading (observations not
+    read on time may be overwritten in the o80 shared memory). The threads
+    communicate via a ring buffer of ring_size observations: if the ring
+    is full, the oldest observations are dropped (see stats)
+    :param int ring_size: size of the ring buffer (threaded mode only)
+    :param float pre_trigger: if not None, trigger capture mode: the
+    observations of the latest pre_trigger seconds are kept in memory, and
+    written only when the trigger fires, followed by the observations of the
+    next post_trigger seconds (a trigger firing during a capture extends it).
+    The logger then waits for the next trigger. The trigger fires when
+    the trigger method (or the fire_trigger function, e.g. from another
+    process) is called, or when the trigger predicate returns True.
+    Not compatible with threaded mode.
+    :param float post_trigger: duration (seconds) of the capture after
+    the trigger (trigger capture mode only)
+    :param trigger: (trigger capture mode only) optional function taking an
+    observation as argument and returning True if the trigger should fire.
+    It is called in the collecting process, so it must be picklable
+    (e.g. a function defined at the module level)
+    :param str trigger_id: (trigger capture mode only) identifier of the
+    trigger, i.e. the trigger_id to pass to fire_trigger from other processes.
+    None: a unique identifier is generated (see the trigger_id property)
+    :param frontend_class: class of the frontend used for reading
+    the observations, o80_pam.FrontEnd (default) or o80_pam.FrontEnd_small
+    (for backends started with a small queue, see run_dummy_robot)
     """
 
-    def __init__(self, segment_id, file_path, frequency=500.0):
+    def __init__(
+        self,
+        segment_id,
+        file_path,
+        frequency=500.0,
+        buffered=False,
+        flush_period=1.0,
+        flush_bytes=4 * 1024 * 1024,
+        file_format="native",
+        segment_size=None,
+        segment_duration=None,
+        compression=None,
+        block_size=1000,
+        threaded=False,
+        ring_size=100000,
+        pre_trigger=None,
+        post_trigger=1.0,
+        trigger=None,
+        trigger_id=None,
+        frontend_class=None,
+    ):
 
+        if file_format not in _formats:
+            raise ValueError(
+                "unknown file format {}, expected one of: {}".format(
+                    file_format, ", ".join(_formats.keys())
+                )
+            )
+        if compression is not None:
+            if compression not in log_compression.codecs:
+                raise ValueError(
+                    "unknown compression codec {}, expected one of: {}".format(
+                        compression, ", ".join(log_compression.codecs.keys())
+                    )
+                )
+            if file_format != "native":
+                raise ValueError("compression requires the native file format")
+        if file_format == "columnar" and (
+            segment_size is not None or segment_duration is not None
+        ):
+            raise ValueError("the columnar file format does not support segments")
+        if pre_trigger is not None and threaded:
+            raise ValueError("trigger capture mode is not compatible with threaded")
+        if pre_trigger is None and trigger is not None:
+            raise ValueError("a trigger predicate requires pre_trigger")
+        if pre_trigger is None and trigger_id is not None:
+            raise ValueError("a trigger_id requires pre_trigger")
+        frontend = "FrontEnd" if frontend_class is None else frontend_class.__name__
+        if frontend not in _frontends:
+            raise ValueError("Logger: unsupported frontend class {}".format(frontend))
         # throwing exception if the folder of file_path
         # does not exists or is not writable
         filename = os.path.basename(file_path)
@@ -91,15 +775,53 @@ class Logger:
             )
         self._file_path = file_path
         self._segment_id = segment_id
-        self._frequency = frequency
         self._id = str(id(self))
+        if trigger_id is None:
+            trigger_id = _trigger_key(self._id)
+        self._config = _LogConfig(
+            segment_id,
+            file_path,
+            frequency,
+            self._id,
+            buffered=buffered,
+            flush_period=flush_period,
+            flush_bytes=flush_bytes,
+            file_format=file_format,
+            segment_size=segment_size,
+            segment_duration=segment_duration,
+            compression=compression,
+            block_size=block_size,
+            threaded=threaded,
+            ring_size=ring_size,
+            pre_trigger=pre_trigger,
+            post_trigger=post_trigger,
+            trigger=trigger,
+            trigger_id=trigger_id,
+            frontend=frontend,
+        )
+        self._stats = _LoggerStats()
+
+    @property
+    def trigger_id(self):
+        """
+        identifier of the trigger of this logger (trigger capture mode),
+        to be passed to fire_trigger by other processes (see the trigger_id
+        argument)
+        """
+        return self._config.trigger_id
+
+    def trigger(self):
+        """
+        fires the trigger (trigger capture mode, see pre_trigger)
+        """
+        fire_trigger(self._segment_id, self.trigger_id)
 
     def start(self):
         """
         starts the observations collecting process
         """
         try:
-            frontend = o80_pam.FrontEnd(self._segment_id)
+            frontend = getattr(o80_pam, self._config.frontend)(self._segment_id)
             del frontend
         except Exception as e:
             raise Exception(
@@ -107,9 +829,14 @@ class Logger:
                 + "on segment_id {}: {}".format(self._segment_id, e)
             )
 
+        if self._config.pre_trigger is not None:
+            # ignoring triggers fired before the start of the logger
+            # (cleared before spawning the process, so that triggers fired
+            # while the process starts are not lost)
+            shared_memory.set_bool(self._segment_id, self.trigger_id, False)
         self._process = Process(
             target=_log,
-            args=(self._segment_id, self._file_path, self._frequency, self._id),
+            args=(self._config, self._stats),
         )
         _set_start(self._segment_id, self._id)
         self._process.start()
@@ -122,6 +849,37 @@ class Logger:
             _set_stop(self._segment_id, self._id)
             self._process.join()
 
+    def write_throughput(self):
+        """
+        returns the throughput (in bytes per second) observed so far
+        by the collecting process when writing into the file, i.e. the
+        number of bytes written divided by the time spent in write and
+        flush calls.
+        """
+        return self._stats.throughput()
+
+    def stats(self):
+        """
+        returns a dictionary of statistics published live by the
+        collecting process (via shared memory):
+        observations (number of observations written), bytes (number of
+        bytes written), missed_iterations (number of iterations of the
+        backend that have not been written, e.g. because the collecting
+        process could not keep up and the o80 buffer has been overwritten),
+        lag (number of iterations between the latest iteration of the backend
+        and the latest iteration written), write_throughput (bytes per second),
+        write_duration (seconds spent in write and flush calls),
+        write_latency_p50, write_latency_p90, write_latency_p99 and
+        write_latency_max (in seconds, duration of recent write calls).
+        In threaded mode: dropped (number of observations dropped because
+        the ring buffer was full, not counted in missed_iterations),
+        backpressure (number of times the collecting thread found the ring
+        buffer at least half full) and ring_filling (current filling of the
+        ring buffer, from 0 to 1).
+        In trigger capture mode: triggers (number of captures).
+        """
+        return self._stats.get()
+
     def __enter__(self):
         """
         For usage of this class as a context manager
@@ -136,45 +894,391 @@ class Logger:
         self.stop()
 
 
-def read_file(file_path):
+def _read_observations(f, serializer, serialized_size, chunk_size=10000):
+    # generator of the observations serialized in f, starting from
+    # the current position of f. Observations are read and deserialized
+    # chunk_size at a time.
+    chunk_bytes = chunk_size * serialized_size
+    data = f.read(chunk_bytes)
+    while data:
+        # note: an incomplete record (file still being written) is ignored
+        yield from serializer.deserialize_many(data)
+        if len(data) < chunk_bytes:
+            # end of file
+            return
+        data = f.read(chunk_bytes)
+
+
+def _is_multi_file(file_path):
+    # imported here as multi_logger imports this module
+    from .multi_logger import is_multi_file
+
+    return is_multi_file(file_path)
+
+
+def _file_paths(file_path):
+    # the path to the file, or the paths to its segments
+    # if the recording has been split (see list_segments)
+    # (native or compressed files only)
+    if os.path.isfile(file_path):
+        paths = [file_path]
+    else:
+        paths = list_segments(file_path)
+    if not paths:
+        raise FileNotFoundError("failed to find {}".format(file_path))
+    for path in paths:
+        if log_columnar.is_columnar(path):
+            raise ValueError(
+                "{} is a columnar log file, to be read via read_file_mmap".format(path)
+            )
+        if _is_multi_file(path):
+            raise ValueError(
+                "{} has been written by MultiLogger, to be read via "
+                "read_multi_file or read_passes".format(path)
+            )
+    return paths
+
+
+class _Follower:
+
+    # reads the observations of a (native) file which is still being
+    # written, one call to poll at a time. Bytes of records not yet
+    # completely written are kept until the rest of the record is
+    # available. For recordings split in several segments, switches to
+    # the next segment once it has been created (the previous one
+    # being then complete). Each call to poll reads at most chunk_size
+    # observations.
+
+    def __init__(self, file_path, serializer, chunk_size=10000):
+        self._file_path = file_path
+        self._segmented = not os.path.isfile(file_path)
+        self._paths = _file_paths(file_path)
+        self._serializer = serializer
+        self._size = serializer.serializable_size()
+        self._chunk_bytes = chunk_size * self._size
+        self._index = 0
+        self._f = None
+        self._open()
+
+    def _open(self):
+        path = self._paths[self._index]
+        if log_compression.is_compressed(path):
+            raise ValueError(
+                "{}: compressed files can not be followed".format(self._file_path)
+            )
+        self._f = open(path, "rb")
+        self._pending = b""
+
+    def _newer_segment(self):
+        # True if a segment following the current one has been created
+        if not self._segmented:
+            return False
+        if self._index + 1 >= len(self._paths):
+            self._paths = list_segments(self._file_path)
+        return self._index + 1 < len(self._paths)
+
+    def _next_segment(self):
+        self._f.close()
+        self._index += 1
+        self._open()
+
+    def _read(self):
+        return self._f.read(self._chunk_bytes - len(self._pending))
+
+    def poll(self):
+        # returns the list of (at most chunk_size) observations written
+        # since the last call (empty list if none)
+        data = self._read()
+        if not data:
+            if not self._newer_segment():
+                return []
+            # the tail of the current segment is flushed when it is closed,
+            # i.e. just before the creation of the next segment: reading the
+            # current segment to its end once more before switching
+            data = self._read()
+            if not data:
+                self._next_segment()
+                return self.poll()
+        data = self._pending + data
+        end = len(data) - len(data) % self._size
+        self._pending = data[end:]
+        return self._serializer.deserialize_many(data[:end])
+
+    def close(self):
+        self._f.close()
+
+
+class _Backoff:
+
+    # polling period, doubling each time nothing new has been read
+    # (up to max_period) and reset once something has been read
+
+    def __init__(self, timeout, min_period=0.001, max_period=0.1):
+        self._timeout = timeout
+        self._min_period = min_period
+        self._max_period = max_period
+        self.reset()
+
+    def reset(self):
+        self._period = self._min_period
+        self._idle_start = time.monotonic()
+
+    def timed_out(self):
+        return (
+            self._timeout is not None
+            and time.monotonic() - self._idle_start >= self._timeout
+        )
+
+    def next_period(self):
+        period = self._period
+        self._period = min(self._period * 2, self._max_period)
+        return period
+
+
+def _follow(file_path, serializer, timeout):
+    follower = _Follower(file_path, serializer)
+    backoff = _Backoff(timeout)
+    try:
+        while True:
+            observations = follower.poll()
+            if observations:
+                backoff.reset()
+                yield from observations
+            elif backoff.timed_out():
+                return
+            else:
+                time.sleep(backoff.next_period())
+    finally:
+        follower.close()
+
+
+def read_file(file_path, serializer=None, follow=False, timeout=None):
     """
     returns a generator of the observations stored in a file
-    created by an instance of Logger.
+    created by an instance of Logger. If the recording has been
+    split in several segments (see list_segments), the observations
+    of all the segments are returned, in order. Compressed files
+    are decompressed one block at a time.
+    If follow is True, the generator does not stop at the end of the
+    file but keeps yielding the observations as they are appended
+    by the Logger (similarly to "tail -f"), polling the file with a
+    period increasing (up to 0.1 second) while no new observation is
+    written. Compressed files can not be followed.
     :param str file_path: path to the file to read
+    :param serializer: serializer used for deserializing the observations,
+    e.g. an instance of o80_pam.MirrorRobotSerializer for files logging a
+    MirrorRobotFrontEnd (see MultiLogger). None: o80_pam.Serializer()
+    :param bool follow: if True, follows the file as it is being written
+    :param float timeout: (follow mode only) the generator stops once no new
+    observation has been written for this duration (seconds).
+    None: never stops
     :raises :py:class:`FileNotFoundError`: if the the file does not exists
+    :raises :py:class:`ValueError`: if the file is a columnar log file
+    (see read_file_mmap)
     :returns: generator of instances of Observation
     """
-    if not os.path.isfile(file_path):
-        raise FileNotFoundError("failed to find {}".format(file_path))
     # a serializer will take a string as input and generate a corresponding instance
     # of observation
-    serializer = o80_pam.Serializer()
+    if serializer is None:
+        serializer = o80_pam.Serializer()
+    if follow:
+        yield from _follow(file_path, serializer, timeout)
+        return
+    file_paths = _file_paths(file_path)
     # size of a string representing an observation
-    serialized_size = o80_pam.Serializer.serializable_size()
-    with open(file_path, "rb") as f:
-        # reading one serialized instance of observation
-        instance_str = f.read(serialized_size)
-        while instance_str:
-            # deserializing it into an observation instance
-            observation = serializer.deserialize(instance_str)
-            # returing the instance
-            yield observation
-            instance_str = f.read(serialized_size)
+    serialized_size = serializer.serializable_size()
+    for path in file_paths:
+        if log_compression.is_compressed(path):
+            yield from log_compression.read_observations(path, serializer=serializer)
+            continue
+        with open(path, "rb") as f:
+            yield from _read_observations(f, serializer, serialized_size)
     # end of file
     return
 
 
+async def aread_file(file_path, serializer=None, follow=False, timeout=None):
+    """
+    asynchronous equivalent of read_file (native files only), i.e. to be
+    used with "async for". While waiting for new observations (follow mode),
+    the event loop is not blocked.
+    :param str file_path: path to the file to read
+    :param serializer: see read_file
+    :param bool follow: see read_file
+    :param float timeout: see read_file
+    :raises :py:class:`FileNotFoundError`: if the the file does not exists
+    :returns: asynchronous generator of instances of Observation
+    """
+    if serializer is None:
+        serializer = o80_pam.Serializer()
+    follower = _Follower(file_path, serializer)
+    backoff = _Backoff(timeout)
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            # reading and deserializing in another thread
+            observations = await loop.run_in_executor(None, follower.poll)
+            if observations:
+                backoff.reset()
+                for observation in observations:
+                    yield observation
+            elif not follow or backoff.timed_out():
+                return
+            else:
+                await asyncio.sleep(backoff.next_period())
+    finally:
+        follower.close()
+
+
+class _RecordReader:
+
+    # random access to the observations of a file created
+    # by an instance of Logger (native format). All serialized
+    # observations have the same size, so the observation of index i
+    # starts at byte i*serialized_size
+
+    def __init__(self, f):
+        self._f = f
+        self._serializer = o80_pam.Serializer()
+        self._size = o80_pam.Serializer.serializable_size()
+        f.seek(0, os.SEEK_END)
+        self.nb_records = f.tell() // self._size
+
+    def get(self, index):
+        self._f.seek(index * self._size)
+        return self._serializer.deserialize(self._f.read(self._size))
+
+    def bisect(self, key, target, lo=0):
+        # index of the first observation for which key(observation) >= target,
+        # assuming key is increasing over the observations
+        hi = self.nb_records
+        while lo < hi:
+            middle = (lo + hi) // 2
+            if key(self.get(middle)) < target:
+                lo = middle + 1
+            else:
+                hi = middle
+        return lo
+
+    def iteration_index(self, iteration):
+        # index of the first observation which iteration is >= iteration.
+        # Iterations increase by one from an observation to the next
+        # unless the logger missed some, so the index is first guessed
+        # and binary search is used only if the guess is wrong
+        if self.nb_records == 0:
+            return 0
+        index = iteration - self.get(0).get_iteration()
+        if index <= 0:
+            return 0
+        if index < self.nb_records and self.get(index).get_iteration() == iteration:
+            return index
+        return self.bisect(lambda obs: obs.get_iteration(), iteration)
+
+    def read_from(self, index):
+        self._f.seek(index * self._size)
+        return _read_observations(self._f, self._serializer, self._size)
+
+
+def _observations_from(file_path, field, value):
+    # generator of the observations of the file, starting from the first
+    # one for which observation.get_<field>() >= value. field is either
+    # "iteration" or "time_stamp" (both increase over the observations)
+    getter = "get_" + field
+    if log_compression.is_compressed(file_path):
+        # the block index provides the first iteration and time stamp of
+        # each block, so only the block containing the first observation
+        # (and the following ones) need to be decompressed
+        blocks = log_compression.read_block_index(file_path)
+        first_values = [getattr(block, "first_" + field) for block in blocks]
+        first_block = max(bisect.bisect_right(first_values, value) - 1, 0)
+        for observation in log_compression.read_observations(file_path, first_block):
+            if getattr(observation, getter)() >= value:
+                yield observation
+        return
+    with open(file_path, "rb") as f:
+        reader = _RecordReader(f)
+        if reader.nb_records == 0:
+            return
+        # skipping the files (segments) which are fully before value
+        if getattr(reader.get(reader.nb_records - 1), getter)() < value:
+            return
+        if field == "iteration":
+            index = reader.iteration_index(value)
+        else:
+            index = reader.bisect(lambda obs: getattr(obs, getter)(), value)
+        yield from reader.read_from(index)
+
+
+def read_range(file_path, start_iteration=None, end_iteration=None):
+    """
+    returns a generator of the observations stored in a file created
+    by an instance of Logger which iteration is in the interval
+    [start_iteration, end_iteration[. Contrary to read_file, the file
+    is not read from its start: the first observation is directly
+    accessed.
+    :param str file_path: path to the file to read
+    :param int start_iteration: first iteration (None: from the first observation)
+    :param int end_iteration: iteration at which reading stops, excluded
+    (None: up to the last observation)
+    :raises :py:class:`FileNotFoundError`: if the the file does not exists
+    :raises :py:class:`ValueError`: if the file is a columnar log file
+    (see read_file_mmap)
+    :returns: generator of instances of Observation
+    """
+    if start_iteration is None:
+        start_iteration = -1
+    for path in _file_paths(file_path):
+        for observation in _observations_from(path, "iteration", start_iteration):
+            if (
+                end_iteration is not None
+                and observation.get_iteration() >= end_iteration
+            ):
+                return
+            yield observation
+
+
+def read_time_window(file_path, t0_ns, t1_ns):
+    """
+    returns a generator of the observations stored in a file created
+    by an instance of Logger which time stamp is in the interval [t0_ns, t1_ns[.
+    The first observation is found via a binary search over the time stamps,
+    i.e. the file is not read from its start.
+    :param str file_path: path to the file to read
+    :param int t0_ns: start of the time window (nanoseconds)
+    :param int t1_ns: end of the time window (nanoseconds, excluded)
+    :raises :py:class:`FileNotFoundError`: if the the file does not exists
+    :raises :py:class:`ValueError`: if the file is a columnar log file
+    (see read_file_mmap)
+    :returns: generator of instances of Observation
+    """
+    for path in _file_paths(file_path):
+        for observation in _observations_from(path, "time_stamp", t0_ns):
+            if observation.get_time_stamp() >= t1_ns:
+                return
+            yield observation
+
+
 class _File:
 
     # convenience class for dealing with files of path
     # /tmp/o80_pam_observations_num_date
     # where num is a counter (or file id)
-    # and date is the date and time of the file creation
+    # and date is the date and time of the file creation.
+    # For recordings split in segments, path is the path
+    # of the logical file (which does not exist as such) and
+    # segments the ordered list of paths of the segments.
+    # For recordings of MultiLogger (interleaved=False), path
+    # is the path passed to MultiLogger, streams the paths of the
+    # files of each stream (segment_id: path) and passes the path of
+    # the passes file (see multi_logger.stream_path and passes_path).
 
-    def __init__(self, path, num, date):
+    def __init__(self, path, num, date, segments=None, streams=None, passes=None):
         self.path = path  # absolute path to the file (name included)
         self.num = num  # num counter
         self.date = date  # date
+        self.segments = segments if segments is not None else []
+        self.streams = streams if streams is not None else {}
+        self.passes = passes
 
     @staticmethod
     def create(prefix, path):
@@ -185,12 +1289,16 @@ class _File:
         filename = os.path.basename(path)
         index = filename.rfind("_")
         num = int(filename[len(prefix) : index])
-        date = filename[index:]
-        return _File(path, num, index)
+        date = filename[index + 1 :]
+        return _File(path, num, date)
 
 
-class FileManager:
+_date_pattern = r"\d{2}-\d{2}-\d{4}\.\d{2}:\d{2}:\d{2}"
+# suffix of the passes file written by MultiLogger (see multi_logger.passes_path)
+_passes_suffix = ".passes"
+
 
+class FileManager:
     """
     Convenience class for ordering the files generated
     by an instance of Logger. It will propose names for new
@@ -198,27 +1306,157 @@ class FileManager:
     e.g. if the file /tmp/o80_pam_observations_5_date already exists,
     it will propose /tmp/o80_pam_observations_6_date as a suitable
     new file path to write data into.
+    The listing of the folder is cached (and refreshed when the modification
+    time of the folder changes), as well as the index of each file (see
+    the index method).
     """
 
     def __init__(self, root_folder="/tmp/", prefix="o80_pam_observations_"):
         self._root_folder = root_folder
         self._prefix = prefix
+        # name of the files proposed by the next method, followed by
+        # the suffix of segments or of the files written by MultiLogger
+        self._pattern = re.compile(
+            r"^({}\d+_{})(\..+)?$".format(re.escape(prefix), _date_pattern)
+        )
+        self._listing = None  # (folder modification time, files)
+        self._indexes = {}  # path: (modification times, index)
 
-    def list_files(self):
-        """
-        Returns the list of absolute path of existing files
-        """
+    def _list_files(self):
         files = [
             f
             for f in os.listdir(self._root_folder)
             if os.path.isfile(os.path.join(self._root_folder, f))
         ]
         files = [
-            os.path.join(self._root_folder, f)
+            f
             for f in files
-            if f.startswith(self._prefix)
+            if f.startswith(self._prefix) and not f.endswith(log_index.SUFFIX)
         ]
-        return [_File.create(self._prefix, f) for f in files]
+        # name of the recording: suffixes of its files
+        # ("" for a single file)
+        recordings = {}
+        for f in files:
+            match = self._pattern.match(f) or _segment_pattern.match(f)
+            if match is None:
+                name, suffix = f, ""
+            else:
+                name = match.group(1)
+                suffix = f[len(name) :]
+            recordings.setdefault(name, []).append(suffix)
+        listed = []
+        for name, suffixes in recordings.items():
+            path = os.path.join(self._root_folder, name)
+            file_ = _File.create(self._prefix, path)
+            for suffix in sorted(suffixes):
+                if not suffix:
+                    continue
+                if _segment_suffix.match(suffix):
+                    file_.segments.append(path + suffix)
+                elif suffix == _passes_suffix:
+                    file_.passes = path + suffix
+                else:
+                    # file of a stream of MultiLogger (suffix: "." + segment_id)
+                    file_.streams[suffix[1:]] = path + suffix
+            listed.append(file_)
+        return listed
+
+    def list_files(self):
+        """
+        Returns the list of existing files. The segments of a recording
+        split in several files are grouped in a single entry, which path
+        can be passed to read_file to read all the segments in order.
+        Similarly, the files written by a MultiLogger (interleaved=False) are
+        grouped in a single entry, which path is the path passed to the
+        MultiLogger (see the streams and passes attributes of the entry).
+        Sidecar index files are not listed.
+        """
+        mtime = os.stat(self._root_folder).st_mtime_ns
+        if self._listing is None or self._listing[0] != mtime:
+            self._listing = (mtime, self._list_files())
+        return list(self._listing[1])
+
+    def _file(self, path):
+        # instance of _File corresponding to the path, found in the
+        # (cached) listing of the folder if not a single file
+        if os.path.isfile(path):
+            return _File(path, None, None)
+        if os.path.dirname(os.path.abspath(path)) == os.path.abspath(self._root_folder):
+            for file_ in self.list_files():
+                if os.path.basename(file_.path) == os.path.basename(path):
+                    return file_
+        return _File(path, None, None, list_segments(path))
+
+    def index(self, file_, serializer=None):
+        """
+        Returns the index of the file (see log_index.Index), i.e. a dictionary
+        with the keys nb_records, nb_gaps, first_iteration, last_iteration,
+        first_time_stamp and last_time_stamp. The index is read from the
+        sidecar index file written by Logger. If missing, it is computed
+        from the content of the file (and the sidecar index file written).
+        For segmented recordings, the indexes of the segments are merged.
+
+        :param file_: instance of _File (as returned by list_files) or path
+        :param serializer: serializer of the observations of the file, if
+        not o80_pam.Serializer (e.g. file of a stream of MultiLogger logging
+        a MirrorRobotFrontEnd, see multi_logger.stream_serializer)
+        :raises :py:class:`ValueError`: for recordings of MultiLogger (the index
+        of each stream can be requested by passing the path of its file)
+        """
+        if not isinstance(file_, _File):
+            file_ = self._file(file_)
+        if file_.streams:
+            raise ValueError(
+                "{} has been written by MultiLogger, "
+                "the index of each stream should be requested".format(file_.path)
+            )
+        paths = file_.segments if file_.segments else [file_.path]
+        mtimes = tuple(os.stat(path).st_mtime_ns for path in paths)
+        cached = self._indexes.get(file_.path)
+        if cached is not None and cached[0] == mtimes:
+            return cached[1]
+        index = log_index.merge(
+            [log_index.get_index(path, serializer) for path in paths]
+        )
+        self._indexes[file_.path] = (mtimes, index)
+        return index
+
+    @staticmethod
+    def _stream_serializer(file_, segment_id):
+        if file_.passes is None:
+            return None
+        from .multi_logger import stream_serializer
+
+        return stream_serializer(file_.path, segment_id)
+
+    def files_in_time_range(self, t0_ns, t1_ns):
+        """
+        Returns the list of files (see list_files) which contain at least
+        one observation which time stamp is in [t0_ns, t1_ns)
+        (based on the indexes of the files, see the index method).
+        """
+        files = []
+        for file_ in self.list_files():
+            if file_.streams:
+                indexes = [
+                    self.index(path, self._stream_serializer(file_, segment_id))
+                    for segment_id, path in file_.streams.items()
+                ]
+            elif not file_.segments and _is_multi_file(file_.path):
+                # interleaved file of MultiLogger, not indexed
+                continue
+            else:
+                indexes = [self.index(file_)]
+            if any(
+                [
+                    index["nb_records"] > 0
+                    and index["first_time_stamp"] < t1_ns
+                    and index["last_time_stamp"] >= t0_ns
+                    for index in indexes
+                ]
+            ):
+                files.append(file_)
+        return files
 
     def next(self):
         """
@@ -0,0 +1,405 @@
+import os
+import json
+import time
+import struct
+from multiprocessing import Process
+import o80
+import o80_pam
+from .logger import (
+    _LogConfig,
+    _LoggerStats,
+    _missed_iterations,
+    _NativeFormat,
+    _Output,
+    _set_start,
+    _set_stop,
+    _should_stop,
+)
+
+_serializers = {
+    "FrontEnd": "Serializer",
+    "MirrorRobotFrontEnd": "MirrorRobotSerializer",
+    "MirrorFreeJointFrontEnd": "MirrorFreeJointSerializer",
+    # frontend of the backends using a small queue (same observations)
+    "FrontEnd_small": "Serializer",
+}
+"""
+name of the frontend classes that can be logged by MultiLogger,
+and name of the related serializer classes
+"""
+
+# Interleaved files (MultiLogger, interleaved=True) start with the magic
+# bytes, the size of a json description of the streams (uint32) and this
+# description. Each observation is then preceded by the index of its stream
+# and the time at which it has been collected (see _RECORD_HEADER).
+# Passes files (MultiLogger, interleaved=False) have the same header, followed
+# by one record per pass of the collecting loop: the time of the pass and
+# the latest iteration of each stream.
+_MAGIC = b"O80PAMM1"
+_RECORD_HEADER = struct.Struct("<Hq")
+
+
+def stream_path(file_path, segment_id):
+    """
+    returns the path of the file in which a MultiLogger (interleaved=False)
+    writes the observations of the stream corresponding to the segment_id.
+    """
+    return "{}.{}".format(file_path, segment_id)
+
+
+def passes_path(file_path):
+    """
+    returns the path of the file in which a MultiLogger (interleaved=False)
+    writes the time base shared by all the streams (see read_passes)
+    """
+    return "{}.passes".format(file_path)
+
+
+def _header(streams):
+    description = json.dumps(
+        {"streams": [{"segment_id": s, "frontend": f} for s, f in streams]}
+    ).encode()
+    return _MAGIC + struct.pack("<I", len(description)) + description
+
+
+def _read_header(f):
+    start = f.read(len(_MAGIC) + 4)
+    if len(start) < len(_MAGIC) + 4 or start[: len(_MAGIC)] != _MAGIC:
+        raise ValueError("not a file written by MultiLogger")
+    (size,) = struct.unpack("<I", start[len(_MAGIC) :])
+    description = json.loads(f.read(size).decode())
+    return [(s["segment_id"], s["frontend"]) for s in description["streams"]]
+
+
+def _serializer(frontend):
+    return getattr(o80_pam, _serializers[frontend])()
+
+
+def is_multi_file(file_path):
+    """
+    returns True if the file starts with the header of the files
+    written by MultiLogger (interleaved file or passes file)
+    """
+    with open(file_path, "rb") as f:
+        return f.read(len(_MAGIC)) == _MAGIC
+
+
+def stream_serializer(file_path, segment_id):
+    """
+    returns an instance of the serializer suitable for the observations
+    of the stream of the segment_id (MultiLogger, interleaved=False),
+    based on the description of the streams in the passes file.
+    :param str file_path: path to the file passed to MultiLogger
+    :raises :py:class:`FileNotFoundError`: if the passes file does not exists
+    """
+    with open(passes_path(file_path), "rb") as f:
+        streams = dict(_read_header(f))
+    return _serializer(streams[segment_id])
+
+
+class _InterleavedFormat:
+
+    # observations of all streams written in a single file,
+    # each observation being preceded by a _RECORD_HEADER
+
+    def __init__(self, streams):
+        self._streams = streams
+        self._serializers = [_serializer(frontend) for _, frontend in streams]
+
+    def header(self):
+        return _header(self._streams)
+
+    def encode(self, entries):
+        # entries: list of (stream index, time of collection, observations)
+        chunks = []
+        for index, time_ns, observations in entries:
+            record_header = _RECORD_HEADER.pack(index, time_ns)
+            serializer = self._serializers[index]
+            for observation in observations:
+                chunks.append(record_header)
+                chunks.append(serializer.serialize(observation))
+        return chunks
+
+    def finish(self):
+        return []
+
+
+class _PassesFormat:
+
+    # for each pass of the collecting loop, its time and the latest
+    # iteration of each stream
+
+    def __init__(self, streams):
+        self._streams = streams
+        self._record = struct.Struct("<q" + "q" * len(streams))
+
+    def header(self):
+        return _header(self._streams)
+
+    def encode(self, passes):
+        # passes: list of (time of collection, latest iterations),
+        # a latest iteration being None (written -1) if no observation
+        # has been collected yet for the corresponding stream
+        return [
+            self._record.pack(time_ns, *[-1 if it is None else it for it in latest])
+            for time_ns, latest in passes
+        ]
+
+    def finish(self):
+        return []
+
+
+# runs a loop reading the observations of all the streams
+# and writting them in the file(s)
+def _multi_log(config, streams, interleaved, stats):
+    try:
+        frontends = [
+            getattr(o80_pam, frontend)(segment_id) for segment_id, frontend in streams
+        ]
+    except Exception as e:
+        print("\nfailed to start the o80 frontends: {}\n".format(e))
+        return
+    if interleaved:
+        output = _Output(config, stats, _InterleavedFormat(streams))
+        outputs = [output]
+    else:
+        stream_outputs = [
+            _Output(
+                _LogConfig(
+                    segment_id,
+                    stream_path(config.file_path, segment_id),
+                    config.frequency,
+                    config.logger_id,
+                    buffered=True,
+                    flush_period=config.flush_period,
+                    flush_bytes=config.flush_bytes,
+                ),
+                stats,
+                _NativeFormat(_serializer(frontend)),
+            )
+            for segment_id, frontend in streams
+        ]
+        passes_output = _Output(
+            _LogConfig(
+                config.segment_id,
+                passes_path(config.file_path),
+                config.frequency,
+                config.logger_id,
+                buffered=True,
+                flush_period=config.flush_period,
+                flush_bytes=config.flush_bytes,
+            ),
+            stats,
+            _PassesFormat(streams),
+        )
+        outputs = stream_outputs + [passes_output]
+    # one collecting loop for all the streams
+    frequency_manager = o80.FrequencyManager(config.frequency)
+    latest = [None] * len(streams)
+    try:
+        while not _should_stop(config.segment_id, config.logger_id):
+            # common time base for all streams
+            time_ns = time.time_ns()
+            entries = []
+            nb_observations, missed, lag = 0, 0, 0
+            for index, frontend in enumerate(frontends):
+                if latest[index] is None:
+                    observations = [frontend.latest()]
+                else:
+                    observations = frontend.get_observations_since(latest[index] + 1)
+                if observations:
+                    missed += _missed_iterations(latest[index], observations)
+                    nb_observations += len(observations)
+                    latest[index] = observations[-1].get_iteration()
+                    entries.append((index, time_ns, observations))
+                if latest[index] is not None:
+                    lag = max(lag, frontend.latest().get_iteration() - latest[index])
+            stats.add_observations(nb_observations, missed, lag)
+            if interleaved:
+                if entries:
+                    output.write(entries)
+            else:
+                for index, _, observations in entries:
+                    stream_outputs[index].write(observations)
+                passes_output.write([(time_ns, latest)])
+            for output_ in outputs:
+                output_.flush_if_due()
+            frequency_manager.wait()
+    finally:
+        for output_ in outputs:
+            output_.close()
+
+
+class MultiLogger:
+    """
+    Similar to Logger, but a single process collects the observations
+    of several o80 backends, using a single collecting loop.
+    Observations are written either in a single interleaved file
+    (read via read_multi_file) or in one file per backend (file_path.segment_id,
+    see stream_path) read via read_file (with the suitable serializer). In the
+    latter case, the file file_path.passes (see read_passes) provides,
+    for each pass of the collecting loop, the time of the pass and the
+    latest iteration of each backend, i.e. a common time base for all streams.
+    This class can be used as context manager.
+
+    :param streams: list of tuple (segment_id, frontend class), the frontend class
+    being o80_pam.FrontEnd, o80_pam.MirrorRobotFrontEnd or
+    o80_pam.MirrorFreeJointFrontEnd (or o80_pam.FrontEnd_small)
+    :param str file_path: absolute path to the file to be written. Files will
+    be overwritten if they already exist
+    :param float frequency: collecting frequency
+    :param bool interleaved: if True, a single file is written
+    :param float flush_period: maximal duration (seconds) between two flushes
+    :param int flush_bytes: maximal number of bytes written between two flushes
+    """
+
+    def __init__(
+        self,
+        streams,
+        file_path,
+        frequency=500.0,
+        interleaved=False,
+        flush_period=1.0,
+        flush_bytes=4 * 1024 * 1024,
+    ):
+        if not streams:
+            raise ValueError("MultiLogger: at least one stream is required")
+        self._streams = []
+        for segment_id, frontend_class in streams:
+            if frontend_class.__name__ not in _serializers:
+                raise ValueError(
+                    "MultiLogger: unsupported frontend class {}".format(
+                        frontend_class.__name__
+                    )
+                )
+            self._streams.append((segment_id, frontend_class.__name__))
+        folder = os.path.dirname(file_path)
+        if not os.path.isdir(folder):
+            raise FileNotFoundError("Failed to find directory: {}".format(folder))
+        if not os.access(folder, os.W_OK):
+            raise FileNotFoundError(
+                "The directory {} does not seem to be writable".format(folder)
+            )
+        # the start / stop flag is hosted by the segment of the first stream
+        self._segment_id = self._streams[0][0]
+        self._id = str(id(self))
+        self._interleaved = interleaved
+        self._config = _LogConfig(
+            self._segment_id,
+            file_path,
+            frequency,
+            self._id,
+            buffered=True,
+            flush_period=flush_period,
+            flush_bytes=flush_bytes,
+        )
+        self._stats = _LoggerStats()
+
+    def start(self):
+        """
+        starts the observations collecting process
+        """
+        for segment_id, frontend in self._streams:
+            try:
+                frontend_ = getattr(o80_pam, frontend)(segment_id)
+                del frontend_
+            except Exception as e:
+                raise Exception(
+                    "Failed to create an o80 frontend "
+                    + "on segment_id {}: {}".format(segment_id, e)
+                )
+        self._process = Process(
+            target=_multi_log,
+            args=(self._config, self._streams, self._interleaved, self._stats),
+        )
+        _set_start(self._segment_id, self._id)
+        self._process.start()
+
+    def stop(self):
+        """
+        stops the observations collecting process
+        """
+        if hasattr(self, "_process"):
+            _set_stop(self._segment_id, self._id)
+            self._process.join()
+
+    def write_throughput(self):
+        """
+        returns the throughput (in bytes per second) observed so far
+        by the collecting process when writing into the file(s)
+        """
+        return self._stats.throughput()
+
+    def stats(self):
+        """
+        returns a dictionary of statistics published live by the
+        collecting process (see Logger.stats). missed_iterations is the
+        sum over all streams, and lag the maximal lag over all streams.
+        """
+        return self._stats.get()
+
+    def __enter__(self):
+        """
+        For usage of this class as a context manager
+        """
+        self.start()
+        return self
+
+    def __exit__(self, _, __, ___):
+        """
+        For usage of this class as a context manager
+        """
+        self.stop()
+
+
+def read_multi_file(file_path):
+    """
+    returns a generator over the observations stored in a file created
+    by an instance of MultiLogger (interleaved=True).
+    :param str file_path: path to the file to read
+    :raises :py:class:`FileNotFoundError`: if the the file does not exists
+    :returns: generator of tuple (segment_id, time of collection
+    in nanoseconds, observation)
+    """
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError("failed to find {}".format(file_path))
+    with open(file_path, "rb") as f:
+        streams = _read_header(f)
+        serializers = [_serializer(frontend) for _, frontend in streams]
+        sizes = [serializer.serializable_size() for serializer in serializers]
+        record_header = f.read(_RECORD_HEADER.size)
+        while len(record_header) == _RECORD_HEADER.size:
+            index, time_ns = _RECORD_HEADER.unpack(record_header)
+            instance_str = f.read(sizes[index])
+            if len(instance_str) < sizes[index]:
+                # incomplete record
+                return
+            yield streams[index][0], time_ns, serializers[index].deserialize(
+                instance_str
+            )
+            record_header = f.read(_RECORD_HEADER.size)
+
+
+def read_passes(file_path):
+    """
+    returns a generator over the passes of the collecting loop of an instance
+    of MultiLogger (interleaved=False).
+    :param str file_path: path to the file passed to MultiLogger
+    :raises :py:class:`FileNotFoundError`: if the the file does not exists
+    :returns: generator of tuple (time of the pass in nanoseconds, dict
+    {segment_id: latest iteration written})
+    """
+    path = passes_path(file_path)
+    if not os.path.isfile(path):
+        raise FileNotFoundError("failed to find {}".format(path))
+    with open(path, "rb") as f:
+        streams = _read_header(f)
+        record = struct.Struct("<q" + "q" * len(streams))
+        data = f.read(record.size)
+        while len(data) == record.size:
+            values = record.unpack(data)
+            yield values[0], {
+                segment_id: iteration
+                for (segment_id, _), iteration in zip(streams, values[1:])
+            }
+            data = f.read(record.size)
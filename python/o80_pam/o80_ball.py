@@ -1,4 +1,5 @@
 import typing
+import numpy as np
 import o80
 import o80_pam
 import context
@@ -49,12 +50,19 @@ class o80Ball:
         else:
             mode = o80.Mode.QUEUE
 
+        durations, positions, velocities = [], [], []
         for duration,state in trajectory_iterator:
-            self._frontend.add_command(state.get_position(),
-                                       state.get_velocity(),
-                                       o80.Duration_us.microseconds(duration),
-                                       mode)
-            mode = o80.Mode.QUEUE
+            durations.append(duration)
+            positions.append(state.get_position())
+            velocities.append(state.get_velocity())
+
+        # all waypoints queued with a single call
+        # (first waypoint in mode, the others in queue mode)
+        if durations:
+            self._frontend.add_commands(np.array(positions),
+                                        np.array(velocities),
+                                        np.array(durations, dtype=np.int64),
+                                        mode)
 
         self._frontend.pulse()
             
@@ -1,3 +1,4 @@
+import numpy as np
 import o80
 import o80_pam
 
@@ -47,19 +48,34 @@ class o80Pressures:
     def add_command(self, action, duration_ms=None):
 
         if duration_ms:
-            duration = o80.Duration_us.milliseconds(duration_ms)
-        else:
-            duration = None
+            self.add_trajectory([action], [duration_ms], overwrite=True)
+            return
 
         for dof, (ago_pressure, antago_pressure) in enumerate(action):
-            if duration:
-                self._frontend.add_command(
-                    dof, ago_pressure, antago_pressure, duration, o80.Mode.OVERWRITE
-                )
-            else:
-                self._frontend.add_command(
-                    dof, ago_pressure, antago_pressure, o80.Mode.OVERWRITE
-                )
+            self._frontend.add_command(
+                dof, ago_pressure, antago_pressure, o80.Mode.OVERWRITE
+            )
+
+    def add_trajectory(self, actions, durations_ms, overwrite=False):
+        """
+        queues a trajectory of pressures with a single call to the frontend.
+        actions: list (or array) of actions, each action being a list of
+        (agonist pressure, antagonist pressure) (one per dof).
+        durations_ms: duration (milliseconds) to reach each action.
+        If overwrite is True, the first action is added in overwrite mode
+        (i.e. the commands previously queued are cancelled).
+        """
+        if overwrite:
+            mode = o80.Mode.OVERWRITE
+        else:
+            mode = o80.Mode.QUEUE
+        self._frontend.add_commands(
+            np.asarray(actions, dtype=np.int32),
+            np.round(np.asarray(durations_ms, dtype=np.float64) * 1000).astype(
+                np.int64
+            ),
+            mode,
+        )
 
     def set(self, action, duration_ms=None, wait=False, burst=False):
 
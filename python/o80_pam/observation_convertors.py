@@ -1,10 +1,18 @@
-from typing import Iterable, Tuple, List
+import os
+import math
+import pickle
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, Tuple, List, Optional
 from pathlib import Path
 import numpy as np
 import pandas as pd
 from functools import reduce, partial
 import o80_pam
 from pam_interface import RobotState
+from . import log_columnar
+from . import log_compression
+from .logger import _file_paths
 
 _dtype = np.float64
 
@@ -73,17 +81,73 @@ columns in a numpy array)
 """
 
 
+_types = {
+    "get_iteration": (np.int64, int),
+    "get_frequency": (np.float64, float),
+    "get_time_stamp": (np.int64, int),
+    "get_positions": (np.float64, float),
+    "get_velocities": (np.float64, float),
+    "get_desired_pressures": (np.int32, int),
+    "get_observed_pressures": (np.int32, int),
+    "get_references_found": (np.bool_, bool),
+}
+"""
+key is the name of a getter function of the class Observation.
+Values are the numpy type of the related columns and the corresponding
+python type
+"""
+
+
+def _observation_dtype() -> np.dtype:
+    """
+    One field per column (see '_column_names'), at the offset of the
+    corresponding value in log_columnar.record_dtype, i.e. arrays of
+    records can be viewed as arrays of dtype 'observation_dtype'
+    """
+    record = log_columnar.record_dtype
+    names, formats, offsets = [], [], []
+    for getter in _ordered_getters:
+        columns = _columns[getter][0]
+        offset = record.fields[getter[len("get_") :]][1]
+        itemsize = np.dtype(_types[getter][0]).itemsize
+        for index, column in enumerate(columns):
+            names.append(column)
+            formats.append(_types[getter][0])
+            offsets.append(offset + index * itemsize)
+    return np.dtype(
+        {
+            "names": names,
+            "formats": formats,
+            "offsets": offsets,
+            "itemsize": record.itemsize,
+        }
+    )
+
+
+observation_dtype = _observation_dtype()
+"""
+numpy structured dtype of the arrays returned by 'observations_to_numpy'
+(one field per column, see '_column_names')
+"""
+
+
+def _column_names() -> Tuple[str, ...]:
+    """
+    Names of the columns of the matrices returned by 'observations_to_numpy'
+    """
+    return reduce(
+        lambda a, b: list(a) + list(b),
+        [_columns[getter][0] for getter in _ordered_getters],
+    )
+
+
 def observation_to_numpy(observation: o80_pam.Observation) -> np.array:
     """
     Cast an observation to a numpy 1d array. Order of values: 
     iteration, frequency, time stamp, positions (4d), velocities (4d),
     desired pressures (8d), observed pressures (8d), references found (4d)
     """
-    values = [
-        _columns[getter][1](getattr(observation, getter)())
-        for getter in _ordered_getters
-    ]
-    return np.concatenate(values)
+    return observation.to_array()
 
 
 def _numpy_to_states(values: np.array) -> o80_pam.States:
@@ -93,16 +157,35 @@ def _numpy_to_states(values: np.array) -> o80_pam.States:
     return states
 
 
+def _record_to_dict(record: np.void) -> dict:
+    d = {}
+    for getter in _ordered_getters:
+        columns = _columns[getter][0]
+        cast = _types[getter][1]
+        values = [cast(record[column]) for column in columns]
+        d[getter[len("get_") :]] = values[0] if len(columns) == 1 else values
+    return d
+
+
 def numpy_to_dict(values: np.array) -> dict:
+    """
+    Cast either an item of an array of dtype 'observation_dtype'
+    (see 'observations_to_numpy') or a 1d array of floats
+    (see 'observation_to_numpy') to a dictionary (see 'dict_to_observation')
+    """
+    if values.dtype.names is not None:
+        return _record_to_dict(values)
+
     def _int(values):
-        if type(values) in (float, _dtype):
+        if np.ndim(values) == 0:
             return int(values)
         return [int(v) for v in values]
 
     def _bool(values):
-        if type(values) in (float, _dtype):
+        if np.ndim(values) == 0:
             return bool(values)
         return [bool(v) for v in values]
+
     return {
         "iteration": _int(values[0]),
         "frequency": values[1],
@@ -155,8 +238,8 @@ def numpy_to_observation(values: np.array) -> o80_pam.Observation:
     """
     Cast a numpy array to an instance of Observation.
     Assumes the numpy array has been created via the function
-    'observation_to_numpy' (or indirectly via the function 
-    'observations_to_pandas').
+    'observation_to_numpy', or is an item of an array created via
+    the function 'observations_to_numpy'.
     """
     d = numpy_to_dict(values)
     return dict_to_observation(d)
@@ -164,8 +247,9 @@ def numpy_to_observation(values: np.array) -> o80_pam.Observation:
 
 def numpy_to_observations(values: np.ndarray) -> List[o80_pam.Observation]:
     """
-    Cast a numpy matrix to instances of Observations. This corresponds to the
-    function 'numpy_to_observation' called on each row of the matrix.
+    Cast a numpy array of dtype 'observation_dtype' (or a matrix of floats)
+    to instances of Observations. This corresponds to the function
+    'numpy_to_observation' called on each item (row) of the array.
     """
     return [numpy_to_observation(v) for v in values]
 
@@ -176,24 +260,61 @@ def pandas_to_observations(dataframe: pd.DataFrame) -> List[o80_pam.Observation]
     This assumes the dataframe has been created via the functions 'observations_to_pandas'
     or 'native_file_to_pandas'
     """
-    return numpy_to_observations(dataframe.to_numpy())
+    return numpy_to_observations(dataframe.to_records(index=False))
+
+
+_chunk_size = 10000
+"""
+default number of observations converted at once by 'observations_to_numpy'
+"""
 
 
 def observations_to_numpy(
     observations: Iterable[o80_pam.Observation],
+    chunk_size: int = _chunk_size,
 ) -> Tuple[np.ndarray, Tuple[str, ...]]:
     """
-    Returns a matrix, each line corresponding to an observation (see 'observation_to_numpy').
-    Also returns corresponding column names.
+    Returns an array of dtype 'observation_dtype', each item corresponding
+    to an observation: iterations and time stamps are int64, pressures int32
+    and references found booleans, i.e. the values are exact.
+    Also returns corresponding column names (i.e. the names of the fields).
+    The observations may be any iterable, e.g. the generator returned by
+    'o80_pam.read_file': they are converted chunk_size at a time into a
+    preallocated array (grown geometrically if the number of observations
+    is not known in advance), i.e. they are not all kept in memory.
     """
-    observation_matrix = np.row_stack(
-        [observation_to_numpy(obs) for obs in observations]
-    )
-    column_names = reduce(
-        lambda a, b: list(a) + list(b),
-        [_columns[getter][0] for getter in _ordered_getters],
-    )
-    return observation_matrix, column_names
+    try:
+        capacity = len(observations)  # type: ignore
+    except TypeError:
+        # e.g. generator
+        capacity = chunk_size
+    # filled with records (see o80_pam.observations_to_records) and then
+    # viewed as an array of dtype observation_dtype (no copy)
+    array = np.empty(capacity, dtype=log_columnar.record_dtype)
+    nb_observations = 0
+    iterator = iter(observations)
+    chunk = list(itertools.islice(iterator, chunk_size))
+    while chunk:
+        end = nb_observations + len(chunk)
+        if end > capacity:
+            capacity = max(2 * capacity, end)
+            # no view over the array exists, so it can be resized in place
+            array.resize(capacity, refcheck=False)
+        array[nb_observations:end] = o80_pam.observations_to_records(chunk)
+        nb_observations = end
+        chunk = list(itertools.islice(iterator, chunk_size))
+    if nb_observations < capacity:
+        array.resize(nb_observations, refcheck=False)
+    return array.view(observation_dtype), _column_names()
+
+
+def _to_pandas(data: np.ndarray, columns: Tuple[str, ...]) -> pd.DataFrame:
+    """
+    Dataframe which columns are the fields of the array (of dtype
+    'observation_dtype'), each of the type of the field. The columns
+    are views over the array (no copy), if supported by the version of pandas.
+    """
+    return pd.DataFrame({column: data[column] for column in columns}, copy=False)
 
 
 def observations_to_pandas(observations: Iterable[o80_pam.Observation]) -> pd.DataFrame:
@@ -201,42 +322,200 @@ def observations_to_pandas(observations: Iterable[o80_pam.Observation]) -> pd.Da
     Cast instances of Observation to a pandas dataframe (which has explicit column names)
     """
     data, columns = observations_to_numpy(observations)
-    return pd.DataFrame(data, columns=columns)
+    return _to_pandas(data, columns)
 
 
-def native_file_to_pandas(origin_path: Path) -> pd.DataFrame:
+_Range = Tuple[str, bool, int, int]
+"""
+part of a log file decoded by a worker process: path to the file,
+True if the file is compressed, index of the first and of the last
+(excluded) record (native files) or block (compressed files)
+"""
+
+
+def _file_ranges(path: Path, nb_ranges: int) -> List[_Range]:
+    """
+    Split the file (or all its segments, for segmented recordings)
+    in ranges of approximately the same size
+    """
+    ranges: List[_Range] = []
+    file_paths = _file_paths(str(path))
+    for file_path in file_paths:
+        compressed = log_compression.is_compressed(file_path)
+        if compressed:
+            nb_items = len(log_compression.read_block_index(file_path))
+        else:
+            serialized_size = o80_pam.Serializer.serializable_size()
+            nb_items = os.path.getsize(file_path) // serialized_size
+        step = max(math.ceil(nb_items * len(file_paths) / nb_ranges), 1)
+        ranges.extend(
+            [
+                (file_path, compressed, start, min(start + step, nb_items))
+                for start in range(0, nb_items, step)
+            ]
+        )
+    return ranges
+
+
+def _decode_range(range_: _Range) -> np.ndarray:
+    """
+    Deserialize the observations of the range and returns them
+    as an array (see 'observations_to_numpy'). Executed by worker
+    processes.
+    """
+    file_path, compressed, start, end = range_
+    if compressed:
+        blocks = log_compression.read_block_index(file_path)
+        nb_observations = sum([block.nb_records for block in blocks[start:end]])
+        observations = list(
+            itertools.islice(
+                log_compression.read_observations(file_path, start), nb_observations
+            )
+        )
+    else:
+        serializer = o80_pam.Serializer()
+        serialized_size = o80_pam.Serializer.serializable_size()
+        with open(file_path, "rb") as f:
+            f.seek(start * serialized_size)
+            data = f.read((end - start) * serialized_size)
+        observations = serializer.deserialize_many(data)
+    if not observations:
+        return np.empty(0, dtype=observation_dtype)
+    return observations_to_numpy(observations)[0]
+
+
+def read_file_parallel(
+    path: Path, workers: Optional[int] = None
+) -> Tuple[np.ndarray, Tuple[str, ...]]:
+    """
+    Equivalent to 'observations_to_numpy(o80_pam.read_file(path))', but the file
+    is split in ranges of observations which are deserialized and cast to numpy
+    by a pool of worker processes. Supports native, compressed and segmented
+    files (see o80_pam.Logger).
+
+    Args:
+        path: file created via o80_pam.Logger (or the executable 'o80_logger')
+        workers: number of worker processes (None: number of cpus)
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    # more ranges than workers, for better balancing
+    ranges = _file_ranges(path, workers * 4)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        arrays = list(executor.map(_decode_range, ranges))
+    if not arrays:
+        return np.empty(0, dtype=observation_dtype), _column_names()
+    return np.concatenate(arrays), _column_names()
+
+
+def native_file_to_pandas(origin_path: Path, workers: int = 1) -> pd.DataFrame:
     """
     Read the file (which is expected to have been created via 
     the executable 'o80_logger') and returns a corresponding 
-    pandas dataframe.
+    pandas dataframe. If workers is higher than 1, the file
+    is decoded by a pool of processes (see 'read_file_parallel').
     """
+    if workers > 1:
+        data, columns = read_file_parallel(origin_path, workers)
+        return _to_pandas(data, columns)
     observations = o80_pam.read_file(origin_path)
     return observations_to_pandas(observations)
 
 
+def _iter_chunks(
+    observations: Iterable[o80_pam.Observation], chunk_size: int
+) -> Iterator[pd.DataFrame]:
+    """
+    Cast the observations to pandas dataframes of (at most) chunk_size rows.
+    The index of the dataframes continues from one chunk to the next.
+    """
+    iterator = iter(observations)
+    start = 0
+    chunk = list(itertools.islice(iterator, chunk_size))
+    while chunk:
+        dataframe = observations_to_pandas(chunk)
+        dataframe.index = pd.RangeIndex(start, start + len(chunk))
+        start += len(chunk)
+        yield dataframe
+        chunk = list(itertools.islice(iterator, chunk_size))
+
+
+def iter_native_file_chunks(
+    path: Path, chunk_size: int = _chunk_size
+) -> Iterator[pd.DataFrame]:
+    """
+    Read the file (which is expected to have been created via
+    the executable 'o80_logger') chunk_size observations at a time,
+    and returns a generator of the corresponding pandas dataframes
+    (see 'observations_to_pandas'). Only one chunk is kept in memory
+    at a time, whatever the length of the recording.
+    """
+    return _iter_chunks(o80_pam.read_file(path), chunk_size)
+
+
 def pickle_observations(
-    observations: Iterable[o80_pam.Observation], destination_file: Path
+    observations: Iterable[o80_pam.Observation],
+    destination_file: Path,
+    chunk_size: int = _chunk_size,
 ) -> None:
     """
-    Cast the observations to a pandas dataframe which is then pickled to 
-    a file.
+    Cast the observations to pandas dataframes of chunk_size rows,
+    which are pickled one after the other to the file (see 'read_pandas').
+    The observations may be any iterable (e.g. a generator), only one
+    chunk being kept in memory at a time.
     """
-    dataframe = observations_to_pandas(observations)
-    dataframe.to_pickle(str(destination_file))
+    with open(destination_file, "wb") as f:
+        for dataframe in _iter_chunks(observations, chunk_size):
+            pickle.dump(dataframe, f, protocol=pickle.HIGHEST_PROTOCOL)
 
 
-def convert_native_file_to_pandas(native_path: Path, destination_file: Path) -> None:
+def convert_native_file_to_pandas(
+    native_path: Path, destination_file: Path, chunk_size: int = _chunk_size
+) -> None:
     """
     Read the file (which is expected to have been created via the executable 'o80_logger'),
-    converts it to a pandas dataframe, which is then pickled in the destination file.
+    and converts it to pandas dataframes (chunk_size rows each) which are pickled
+    in the destination file as they are read, i.e. memory usage does not depend on
+    the length of the recording.
     """
     observations = o80_pam.read_file(native_path)
-    pickle_observations(observations, destination_file)
+    pickle_observations(observations, destination_file, chunk_size)
+
+
+def iter_pandas(path: Path) -> Iterator[pd.DataFrame]:
+    """
+    Read the file (expected to have been created via 'convert_native_file_to_pandas'
+    or 'pickle_observations') and returns a generator of the pandas dataframes
+    it contains, i.e. one chunk of observations at a time.
+    """
+    with open(path, "rb") as f:
+        try:
+            dataframe = pickle.load(f)
+        except EOFError:
+            # no observation
+            return
+        except Exception:
+            # e.g. compressed file written by a former version of
+            # 'pickle_observations' (which used DataFrame.to_pickle)
+            yield pd.read_pickle(path)
+            return
+        while True:
+            yield dataframe
+            try:
+                dataframe = pickle.load(f)
+            except EOFError:
+                return
 
 
 def read_pandas(path: Path) -> pd.DataFrame:
     """
     Read the file (expected to have been created via 'convert_native_file_to_pandas'
-    or 'pickle_observations') and returns the corresponding pandas dataframe.
+    or 'pickle_observations') and returns the corresponding pandas dataframe,
+    i.e. the concatenation of all the chunks of the file.
     """
-    return pd.read_pickle(path)
+    dataframes = list(iter_pandas(path))
+    if len(dataframes) == 1:
+        return dataframes[0]
+    if not dataframes:
+        return observations_to_pandas([])
+    return pd.concat(dataframes)
@@ -0,0 +1,204 @@
+import struct
+import typing
+import o80_pam
+from pam_interface import RobotState
+from . import log_compression
+from .logger import _file_paths
+
+# Layout of serialized observations.
+# The byte offset of each field in the string returned by
+# o80_pam.Serializer.serialize is found once (when first needed)
+# by serializing observations which differ by a single value
+# and comparing the results (see _probe_layout).
+
+_fields = {
+    # field: (struct format of an element, number of elements)
+    "iteration": ("q", 1),
+    "time_stamp": ("q", 1),
+    "frequency": ("d", 1),
+    "positions": ("d", 4),
+    "velocities": ("d", 4),
+    "desired_pressures": ("i", 8),
+    "observed_pressures": ("i", 8),
+    "references_found": ("?", 4),
+}
+
+# values with no null byte, so that all the bytes
+# of the field differ from the base observation
+_probe_values = {
+    "q": 0x0101010101010101,
+    "d": struct.unpack("<d", b"\x11" * 8)[0],
+    "i": 0x01010101,
+    "?": True,
+}
+
+
+def _make_observation(values: typing.Dict[str, list]) -> o80_pam.Observation:
+    def _states(pressures):
+        states = o80_pam.States()
+        for index, state in enumerate(states.values):
+            state.set(pressures[index])
+        return states
+
+    robot_state = RobotState()
+    for dof in range(4):
+        # the pressures of the robot state are not used by the getters
+        # of Observation, so they are left to 0
+        robot_state.set_joint(
+            dof,
+            0,
+            0,
+            0,
+            0,
+            values["positions"][dof],
+            values["velocities"][dof],
+            -1,
+            values["references_found"][dof],
+        )
+    return o80_pam.Observation(
+        _states(values["observed_pressures"]),
+        _states(values["desired_pressures"]),
+        robot_state,
+        values["time_stamp"][0],
+        values["iteration"][0],
+        values["frequency"][0],
+    )
+
+
+def _probe_layout() -> typing.Dict[str, typing.Tuple[int, struct.Struct]]:
+    serializer = o80_pam.Serializer()
+    zeros = {field: [0] * nb for field, (_, nb) in _fields.items()}
+    zeros["references_found"] = [False] * 4
+    base = serializer.serialize(_make_observation(zeros))
+    layout = {}
+    for field, (fmt, nb) in _fields.items():
+        offsets = []
+        for index in range(nb):
+            values = {f: list(v) for f, v in zeros.items()}
+            values[field][index] = _probe_values[fmt]
+            probe = serializer.serialize(_make_observation(values))
+            diff = [i for i, (a, b) in enumerate(zip(base, probe)) if a != b]
+            # the value may be serialized more than once (e.g. if stored
+            # by several members), the first occurrence is used
+            starts = [i for i in diff if i - 1 not in diff]
+            matches = [
+                i
+                for i in starts
+                if struct.unpack_from("<" + fmt, probe, i)[0] == _probe_values[fmt]
+            ]
+            if not matches:
+                raise RuntimeError(
+                    "failed to find the layout of the serialized field {}".format(field)
+                )
+            offsets.append(matches[0])
+        # single struct for all the elements of the field, starting
+        # at the first element, with padding between the elements
+        # (if not contiguous)
+        fmt_all, end = "<", offsets[0]
+        for offset in offsets:
+            fmt_all += "x" * (offset - end) + fmt
+            end = offset + struct.calcsize(fmt)
+        layout[field] = (offsets[0], struct.Struct(fmt_all))
+    return layout
+
+
+_layout: typing.Optional[typing.Dict[str, typing.Tuple[int, struct.Struct]]] = None
+
+
+def _get_layout() -> typing.Dict[str, typing.Tuple[int, struct.Struct]]:
+    global _layout
+    if _layout is None:
+        _layout = _probe_layout()
+    return _layout
+
+
+class ObservationView:
+    """
+    Read only view over a serialized observation (as returned by
+    o80_pam.Serializer.serialize or stored in the files written by
+    o80_pam.Logger), providing the same getters as o80_pam.Observation
+    (except for the states getters). The buffer is not copied and
+    each getter decodes only the related bytes, which is much cheaper
+    than deserializing the complete observation when only some of its
+    fields are required.
+
+    Args:
+        buffer: serialized observation (any object supporting the buffer
+          protocol, e.g. bytes or a slice of a memoryview)
+    """
+
+    __slots__ = ("_buffer", "_layout")
+
+    def __init__(self, buffer: typing.Union[bytes, memoryview]):
+        self._buffer = memoryview(buffer)
+        self._layout = _get_layout()
+
+    def _get(self, field: str) -> tuple:
+        offset, struct_ = self._layout[field]
+        return struct_.unpack_from(self._buffer, offset)
+
+    def get_iteration(self) -> int:
+        return self._get("iteration")[0]
+
+    def get_time_stamp(self) -> int:
+        return self._get("time_stamp")[0]
+
+    def get_frequency(self) -> float:
+        return self._get("frequency")[0]
+
+    def get_positions(self) -> typing.List[float]:
+        return list(self._get("positions"))
+
+    def get_velocities(self) -> typing.List[float]:
+        return list(self._get("velocities"))
+
+    def get_desired_pressures(self) -> typing.List[typing.Tuple[int, int]]:
+        p = self._get("desired_pressures")
+        return [(p[2 * dof], p[2 * dof + 1]) for dof in range(4)]
+
+    def get_observed_pressures(self) -> typing.List[typing.Tuple[int, int]]:
+        p = self._get("observed_pressures")
+        return [(p[2 * dof], p[2 * dof + 1]) for dof in range(4)]
+
+    def get_references_found(self) -> typing.List[bool]:
+        return list(self._get("references_found"))
+
+    def to_observation(self) -> o80_pam.Observation:
+        """
+        Deserialize the complete observation
+        """
+        return o80_pam.Serializer().deserialize(self._buffer.tobytes())
+
+
+def read_file_views(
+    file_path: str, chunk_size: int = 10000
+) -> typing.Generator[ObservationView, None, None]:
+    """
+    Equivalent to o80_pam.read_file, but returns a generator of ObservationView
+    rather than of Observation. The file is read chunk_size observations at a time
+    (compressed files: one block at a time) and the views point directly into the
+    chunk read from the file.
+    """
+    serialized_size = o80_pam.Serializer.serializable_size()
+    for path in _file_paths(file_path):
+        if log_compression.is_compressed(path):
+            for data in log_compression.read_blocks(path):
+                buffer = memoryview(data)
+                for index in range(0, len(data), serialized_size):
+                    yield ObservationView(buffer[index : index + serialized_size])
+            continue
+        chunk_bytes = chunk_size * serialized_size
+        with open(path, "rb") as f:
+            data = f.read(chunk_bytes)
+            while len(data) >= serialized_size:
+                buffer = memoryview(data)
+                # an incomplete record at the end of the file is ignored
+                end = len(data) - len(data) % serialized_size
+                for index in range(0, end, serialized_size):
+                    yield ObservationView(buffer[index : index + serialized_size])
+                if len(data) < chunk_bytes:
+                    # end of file (as for read_file, the bytes appended since,
+                    # e.g. by a running logger, are not read: the next read
+                    # would not be aligned on a record)
+                    break
+                data = f.read(chunk_bytes)
@@ -141,18 +141,28 @@ def configure(robot : str):
     return config
 
 
+# context manager running a dummy robot. If small_queue is True,
+# the backend uses a smaller o80 queue (i.e. less shared memory) and
+# must be accessed via o80_pam.FrontEnd_small (rather than o80_pam.FrontEnd)
 class run_dummy_robot:
-    def __init__(self, segment_id, frequency, bursting_mode, pam_config_path):
+    def __init__(
+        self, segment_id, frequency, bursting_mode, pam_config_path, small_queue=False
+    ):
         self._segment_id = segment_id
         self._frequency = frequency
         self._bursting_mode = bursting_mode
         self._pam_config_path = pam_config_path
+        self._small_queue = small_queue
         if not os.path.isfile(pam_config_path):
             raise FileNotFoundError("failed to find: {}".format(pam_config_path))
 
     def __enter__(self):
         pam_config = pam_interface.JsonConfiguration(self._pam_config_path)
-        o80_pam.dummy_start_standalone(
+        if self._small_queue:
+            start_standalone = o80_pam.dummy_small_start_standalone
+        else:
+            start_standalone = o80_pam.dummy_start_standalone
+        start_standalone(
             self._segment_id, self._frequency, self._bursting_mode, pam_config
         )
         return
@@ -1,5 +1,12 @@
+#include <algorithm>
+#include <cstring>
+#include <functional>
 #include <memory>
+#include <stdexcept>
 #include <tuple>
+#include <vector>
+
+#include <pybind11/numpy.h>
 
 #include "o80/front_end.hpp"
 #include "o80/pybind11_helper.hpp"
@@ -15,6 +22,11 @@
 
 #define NB_DOFS 4
 #define QUEUE_SIZE 5000000
+// queue size of the "small" variants of the frontends and standalones
+// (FrontEnd_small and dummy_small_start_standalone), for hosts running
+// many (simulated) robots. There is no mirroring backend using a small
+// queue, hence no small variants of the mirroring frontends
+#define SMALL_QUEUE_SIZE 100000
 
 // pressures action sent to the robot_interfaces backend
 typedef pam_interface::PressureAction<NB_DOFS * 2> PressureAction;
@@ -46,6 +58,406 @@ typedef o80_pam::Standalone<QUEUE_SIZE, NB_DOFS * 2, DummyDriver>
     DummyStandalone;
 typedef o80_pam::Standalone<QUEUE_SIZE, NB_DOFS * 2, Pamy1Driver> Pamy1Standalone;
 typedef o80_pam::Standalone<QUEUE_SIZE, NB_DOFS * 2, Pamy2Driver> Pamy2Standalone;
+typedef o80_pam::Standalone<SMALL_QUEUE_SIZE, NB_DOFS * 2, DummyDriver>
+    DummySmallStandalone;
+
+// number of values of an observation cast to an array (see
+// observation_to_array): iteration, frequency, time stamp,
+// positions, velocities, desired pressures, observed pressures
+// and references found
+#define OBSERVATION_ARRAY_SIZE (3 + 7 * NB_DOFS)
+
+typedef o80::Observation<2 * NB_DOFS,
+                         o80_pam::ActuatorState,
+                         pam_interface::RobotState<NB_DOFS>>
+    PamObservation;
+
+// writes the values of the observation in values (OBSERVATION_ARRAY_SIZE
+// doubles), in the order of o80_pam.observation_convertors.observation_to_numpy
+void observation_to_array(const PamObservation& obs, double* values)
+{
+    const pam_interface::RobotState<NB_DOFS>& robot = obs.get_extended_state();
+    o80::States<NB_DOFS * 2, ActuatorState> desired = obs.get_desired_states();
+    o80::States<NB_DOFS * 2, ActuatorState> observed = obs.get_observed_states();
+    values[0] = static_cast<double>(obs.get_iteration());
+    values[1] = obs.get_frequency();
+    values[2] = static_cast<double>(obs.get_time_stamp());
+    double* positions = values + 3;
+    double* velocities = positions + NB_DOFS;
+    double* desired_pressures = velocities + NB_DOFS;
+    double* observed_pressures = desired_pressures + 2 * NB_DOFS;
+    double* references_found = observed_pressures + 2 * NB_DOFS;
+    for (uint dof = 0; dof < NB_DOFS; dof++)
+    {
+        positions[dof] = robot.get_position(dof);
+        velocities[dof] = robot.get_velocity(dof);
+        references_found[dof] = robot.get_reference_found(dof) ? 1. : 0.;
+    }
+    for (uint actuator = 0; actuator < 2 * NB_DOFS; actuator++)
+    {
+        desired_pressures[actuator] = desired.get(actuator).get();
+        observed_pressures[actuator] = observed.get(actuator).get();
+    }
+}
+
+typedef o80::Observation<NB_DOFS, o80::State2d, o80_pam::RobotFKExtendedState>
+    MirrorRobotObservation;
+
+typedef o80::Observation<6, o80::State1d, o80::VoidExtendedState>
+    MirrorFreeJointObservation;
+
+// Records returned by the get_observations_since_array and
+// get_latest_observations_array methods of the frontends, i.e.
+// items of numpy structured arrays (see PYBIND11_NUMPY_DTYPE in
+// PYBIND11_MODULE). PamRecord has the same fields and layout as
+// o80_pam.log_columnar.record_dtype: it is packed (no trailing padding),
+// so that the arrays can be written as is into columnar log files.
+
+#pragma pack(push, 1)
+struct PamRecord
+{
+    int64_t iteration;
+    int64_t time_stamp;
+    double frequency;
+    double positions[NB_DOFS];
+    double velocities[NB_DOFS];
+    int32_t desired_pressures[2 * NB_DOFS];
+    int32_t observed_pressures[2 * NB_DOFS];
+    bool references_found[NB_DOFS];
+};
+#pragma pack(pop)
+static_assert(sizeof(PamRecord) == 156,
+              "PamRecord must match o80_pam.log_columnar.record_dtype");
+
+struct MirrorRobotRecord
+{
+    int64_t iteration;
+    int64_t time_stamp;
+    double frequency;
+    double positions[NB_DOFS];
+    double velocities[NB_DOFS];
+    double cartesian_position[3];
+    double cartesian_orientation[9];
+};
+
+struct MirrorFreeJointRecord
+{
+    int64_t iteration;
+    int64_t time_stamp;
+    double frequency;
+    double position[3];
+    double velocity[3];
+};
+
+void to_record(const PamObservation& obs, PamRecord& record)
+{
+    const pam_interface::RobotState<NB_DOFS>& robot = obs.get_extended_state();
+    o80::States<NB_DOFS * 2, ActuatorState> desired = obs.get_desired_states();
+    o80::States<NB_DOFS * 2, ActuatorState> observed = obs.get_observed_states();
+    record.iteration = obs.get_iteration();
+    record.time_stamp = obs.get_time_stamp();
+    record.frequency = obs.get_frequency();
+    for (uint dof = 0; dof < NB_DOFS; dof++)
+    {
+        record.positions[dof] = robot.get_position(dof);
+        record.velocities[dof] = robot.get_velocity(dof);
+        record.references_found[dof] = robot.get_reference_found(dof);
+    }
+    for (uint actuator = 0; actuator < 2 * NB_DOFS; actuator++)
+    {
+        record.desired_pressures[actuator] = desired.get(actuator).get();
+        record.observed_pressures[actuator] = observed.get(actuator).get();
+    }
+}
+
+void to_record(const MirrorRobotObservation& obs, MirrorRobotRecord& record)
+{
+    o80::States<NB_DOFS, o80::State2d> observed = obs.get_observed_states();
+    o80_pam::RobotFKExtendedState fk = obs.get_extended_state();
+    record.iteration = obs.get_iteration();
+    record.time_stamp = obs.get_time_stamp();
+    record.frequency = obs.get_frequency();
+    for (uint dof = 0; dof < NB_DOFS; dof++)
+    {
+        record.positions[dof] = observed.get(dof).get<0>();
+        record.velocities[dof] = observed.get(dof).get<1>();
+    }
+    std::copy(fk.get_position().begin(),
+              fk.get_position().end(),
+              record.cartesian_position);
+    std::copy(fk.get_orientation().begin(),
+              fk.get_orientation().end(),
+              record.cartesian_orientation);
+}
+
+void to_record(const MirrorFreeJointObservation& obs,
+               MirrorFreeJointRecord& record)
+{
+    o80::States<6, o80::State1d> observed = obs.get_observed_states();
+    record.iteration = obs.get_iteration();
+    record.time_stamp = obs.get_time_stamp();
+    record.frequency = obs.get_frequency();
+    for (int dim = 0; dim < 3; dim++)
+    {
+        record.position[dim] = observed.get(2 * dim).get();
+        record.velocity[dim] = observed.get(2 * dim + 1).get();
+    }
+}
+
+// calls get_observations (e.g. a call to get_observations_since
+// of a frontend) and casts the observations into a numpy structured
+// array. The GIL is released, except for the creation of the array.
+template <class Record, class Observation>
+pybind11::array_t<Record> observations_to_records(
+    std::function<std::vector<Observation>()> get_observations)
+{
+    std::vector<Observation> observations;
+    {
+        pybind11::gil_scoped_release release;
+        observations = get_observations();
+    }
+    pybind11::array_t<Record> records(observations.size());
+    Record* data = records.mutable_data();
+    {
+        pybind11::gil_scoped_release release;
+        for (std::size_t index = 0; index < observations.size(); index++)
+        {
+            to_record(observations[index], data[index]);
+        }
+    }
+    return records;
+}
+
+// adds get_observations_since_array and get_latest_observations_array
+// to the bindings of a frontend
+template <class Record, class Observation, class Frontend>
+void add_records_getters(pybind11::class_<Frontend>& py_frontend)
+{
+    py_frontend
+        .def("get_observations_since_array",
+             [](Frontend& fe, long int iteration)
+             {
+                 return observations_to_records<Record, Observation>(
+                     [&fe, iteration]()
+                     { return fe.get_observations_since(iteration); });
+             })
+        .def("get_latest_observations_array",
+             [](Frontend& fe, std::size_t nb_items)
+             {
+                 return observations_to_records<Record, Observation>(
+                     [&fe, nb_items]()
+                     { return fe.get_latest_observations(nb_items); });
+             });
+}
+
+typedef pybind11::array_t<long int,
+                          pybind11::array::c_style | pybind11::array::forcecast>
+    LongArray;
+typedef pybind11::array_t<int,
+                          pybind11::array::c_style | pybind11::array::forcecast>
+    IntArray;
+typedef pybind11::array_t<double,
+                          pybind11::array::c_style | pybind11::array::forcecast>
+    DoubleArray;
+
+// throws std::invalid_argument if the array does not have the expected shape
+void check_shape(const pybind11::array& array,
+                 const std::vector<pybind11::ssize_t>& shape,
+                 const std::string& name)
+{
+    bool ok = array.ndim() == static_cast<pybind11::ssize_t>(shape.size());
+    for (std::size_t dim = 0; ok && dim < shape.size(); dim++)
+    {
+        ok = array.shape(dim) == shape[dim];
+    }
+    if (!ok)
+    {
+        throw std::invalid_argument(name + ": unexpected shape");
+    }
+}
+
+// queues the commands of a trajectory of nb_waypoints waypoints.
+// add_waypoint(index, duration or iteration, mode) adds the commands of the
+// waypoint of the given index, the first waypoint using mode and the
+// others o80::Mode::QUEUE. durations_or_iterations: durations
+// (microseconds), or (absolute) iterations if iterations is true.
+// The GIL is released while queuing the commands.
+template <class AddWaypoint>
+void add_trajectory(AddWaypoint add_waypoint,
+                    pybind11::ssize_t nb_waypoints,
+                    const LongArray& durations_or_iterations,
+                    o80::Mode mode,
+                    bool iterations)
+{
+    check_shape(
+        durations_or_iterations, {nb_waypoints}, "durations_or_iterations");
+    const long int* values = durations_or_iterations.data();
+    pybind11::gil_scoped_release release;
+    for (pybind11::ssize_t index = 0; index < nb_waypoints; index++)
+    {
+        o80::Mode waypoint_mode = index == 0 ? mode : o80::Mode::QUEUE;
+        if (iterations)
+        {
+            add_waypoint(index, o80::Iteration(values[index]), waypoint_mode);
+        }
+        else
+        {
+            add_waypoint(index,
+                         o80::Duration_us::microseconds(values[index]),
+                         waypoint_mode);
+        }
+    }
+}
+
+// serializes the observations one after the other in data
+// (which must be big enough), each observation using
+// serializable_size bytes. Does not require the GIL.
+template <class Observation>
+void serialize_to(shared_memory::Serializer<Observation>& s,
+                  const std::vector<Observation>& observations,
+                  char* data)
+{
+    std::size_t size = s.serializable_size();
+    for (std::size_t index = 0; index < observations.size(); index++)
+    {
+        std::string serialized = s.serialize(observations[index]);
+        std::memcpy(data + index * size,
+                    serialized.data(),
+                    std::min(size, serialized.size()));
+    }
+}
+
+// adds to the bindings of a serializer the functions
+// serialize_many, serialize_into and deserialize_many, which
+// (de)serialize several observations with a single python call
+// (the GIL being released while looping over the observations)
+template <class Observation>
+void add_bulk_serialization(
+    pybind11::class_<shared_memory::Serializer<Observation>>& py_serializer)
+{
+    typedef shared_memory::Serializer<Observation> serializer;
+    py_serializer
+        .def("serialize_many",
+             [](serializer& s, const std::vector<Observation>& observations)
+             {
+                 // allocating the python bytes, then filling it
+                 std::size_t total =
+                     s.serializable_size() * observations.size();
+                 pybind11::bytes bytes = pybind11::reinterpret_steal<
+                     pybind11::bytes>(PyBytes_FromStringAndSize(nullptr, total));
+                 char* data = PyBytes_AS_STRING(bytes.ptr());
+                 {
+                     pybind11::gil_scoped_release release;
+                     serialize_to(s, observations, data);
+                 }
+                 return bytes;
+             })
+        .def("serialize_into",
+             [](serializer& s,
+                const std::vector<Observation>& observations,
+                pybind11::buffer buffer)
+             {
+                 // writing into a (writable) buffer provided by
+                 // the caller (e.g. bytearray, numpy array, mmap),
+                 // returns the number of bytes written
+                 pybind11::buffer_info info = buffer.request(true);
+                 std::size_t total =
+                     s.serializable_size() * observations.size();
+                 if (static_cast<std::size_t>(info.size * info.itemsize) < total)
+                 {
+                     throw std::invalid_argument(
+                         "buffer too small for the serialized observations");
+                 }
+                 {
+                     pybind11::gil_scoped_release release;
+                     serialize_to(s, observations, static_cast<char*>(info.ptr));
+                 }
+                 return total;
+             })
+        .def("deserialize_many",
+             [](serializer& s, pybind11::buffer buffer)
+             {
+                 // buffer: any (contiguous) object supporting the
+                 // buffer protocol. An incomplete observation at the end
+                 // of the buffer is ignored.
+                 pybind11::buffer_info info = buffer.request();
+                 if (info.ndim != 1 || info.strides[0] != info.itemsize)
+                 {
+                     throw std::invalid_argument("contiguous buffer expected");
+                 }
+                 std::size_t size = s.serializable_size();
+                 std::size_t nb_observations =
+                     static_cast<std::size_t>(info.size * info.itemsize) / size;
+                 const char* data = static_cast<const char*>(info.ptr);
+                 std::vector<Observation> observations(nb_observations);
+                 {
+                     pybind11::gil_scoped_release release;
+                     std::string serialized;
+                     for (std::size_t index = 0; index < nb_observations;
+                          index++)
+                     {
+                         serialized.assign(data + index * size, size);
+                         s.deserialize(serialized, observations[index]);
+                     }
+                 }
+                 return observations;
+             });
+}
+
+// adds to the bindings of an observation the support for pickle
+// and the conversion to and from the bytes of its serialization
+// (as returned by the related serializer)
+template <class Observation>
+void add_bytes_conversion(pybind11::class_<Observation>& py_observation)
+{
+    typedef shared_memory::Serializer<Observation> serializer;
+    py_observation
+        .def("__bytes__",
+             [](const Observation& o)
+             {
+                 serializer s;
+                 return pybind11::bytes(s.serialize(o));
+             })
+        .def_static("from_bytes",
+                    [](pybind11::buffer buffer)
+                    {
+                        // buffer: any (contiguous) object supporting the
+                        // buffer protocol, e.g. bytes, memoryview or
+                        // shared memory
+                        pybind11::buffer_info info = buffer.request();
+                        serializer s;
+                        std::size_t size = s.serializable_size();
+                        if (info.ndim != 1 || info.strides[0] != info.itemsize)
+                        {
+                            throw std::invalid_argument(
+                                "contiguous buffer expected");
+                        }
+                        if (static_cast<std::size_t>(info.size * info.itemsize) <
+                            size)
+                        {
+                            throw std::invalid_argument(
+                                "buffer smaller than a serialized observation");
+                        }
+                        std::string serialized(
+                            static_cast<const char*>(info.ptr), size);
+                        Observation o;
+                        s.deserialize(serialized, o);
+                        return o;
+                    })
+        .def(pybind11::pickle(
+            [](const Observation& o)
+            {
+                serializer s;
+                return pybind11::bytes(s.serialize(o));
+            },
+            [](const pybind11::bytes& state)
+            {
+                serializer s;
+                Observation o;
+                s.deserialize(std::string(state), o);
+                return o;
+            }));
+}
 
 // add the bindings to o80::Observation
 // (with extra functions compared to the native o80 wrappers)
@@ -55,7 +467,9 @@ void add_observation_and_serializer(pybind11::module& m)
                              o80_pam::ActuatorState,
                              pam_interface::RobotState<NB_DOFS>>
         observation;
-    pybind11::class_<observation>(m, "Observation")
+    pybind11::class_<observation> py_observation(m, "Observation");
+    add_bytes_conversion(py_observation);
+    py_observation
         .def(pybind11::init<>())
         .def(pybind11::init< States, States,
 	                     pam_interface::RobotState<NB_DOFS>,
@@ -130,6 +544,14 @@ void add_observation_and_serializer(pybind11::module& m)
         .def("get_iteration", &observation::get_iteration)
         .def("get_frequency", &observation::get_frequency)
         .def("get_time_stamp", &observation::get_time_stamp)
+        .def("to_array",
+             [](const observation& obs)
+             {
+                 // same as o80_pam.observation_convertors.observation_to_numpy
+                 pybind11::array_t<double> array(OBSERVATION_ARRAY_SIZE);
+                 observation_to_array(obs, array.mutable_data());
+                 return array;
+             })
         .def("__str__",
              [](const observation& o)
              {
@@ -167,7 +589,8 @@ void add_observation_and_serializer(pybind11::module& m)
              });
 
     typedef shared_memory::Serializer<observation> serializer;
-    pybind11::class_<serializer>(m, "Serializer")
+    pybind11::class_<serializer> py_serializer(m, "Serializer");
+    py_serializer
         .def(pybind11::init<>())
         .def("serializable_size", &serializer::serializable_size)
         .def("serialize",
@@ -186,31 +609,42 @@ void add_observation_and_serializer(pybind11::module& m)
                  s.deserialize(serialized, o);
                  return o;
              });
+    add_bulk_serialization<observation>(py_serializer);
 }
 
 // add the bindings to o80::FrontEnd
-// (with extra functions compared to the native o80 wrappers)
-void add_frontend(pybind11::module& m)
+// (with extra functions compared to the native o80 wrappers),
+// the name of the python class being "FrontEnd" + suffix
+template <int queue_size>
+void add_frontend(pybind11::module& m, const std::string& suffix = "")
 {
     typedef o80::Observation<2 * NB_DOFS,
                              o80_pam::ActuatorState,
                              pam_interface::RobotState<NB_DOFS>>
         observation;
 
-    typedef o80::FrontEnd<QUEUE_SIZE,
+    typedef o80::FrontEnd<queue_size,
                           NB_DOFS * 2,
                           o80_pam::ActuatorState,
                           pam_interface::RobotState<NB_DOFS>>
         frontend;
-    pybind11::class_<frontend>(m, "FrontEnd")
+    pybind11::class_<frontend> py_frontend(m, ("FrontEnd" + suffix).c_str());
+    py_frontend
         // generic frontend bindings (similar to what o80::pybind11_helper.hpp
-        // creates)
+        // creates). The GIL is released during the calls that may block
+        // or copy from the shared memory
         .def(pybind11::init<std::string>())
         .def("get_frequency", &frontend::get_frequency)
         .def("get_nb_actuators", &frontend::get_nb_actuators)
-        .def("get_observations_since", &frontend::get_observations_since)
-        .def("get_latest_observations", &frontend::get_latest_observations)
-        .def("wait_for_next", &frontend::wait_for_next)
+        .def("get_observations_since",
+             &frontend::get_observations_since,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
+        .def("get_latest_observations",
+             &frontend::get_latest_observations,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
+        .def("wait_for_next",
+             &frontend::wait_for_next,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
         .def("reset_next_index", &frontend::reset_next_index)
         .def("purge", &frontend::purge)
         .def("initial_states", &frontend::initial_states)
@@ -230,11 +664,21 @@ void add_frontend(pybind11::module& m)
                  int, o80_pam::ActuatorState, o80::Speed, o80::Mode)) &
                  frontend::add_command)
         .def("add_reinit_command", &frontend::add_reinit_command)
-        .def("burst", &frontend::burst)
-        .def("final_burst", &frontend::final_burst)
-        .def("pulse_and_wait", &frontend::pulse_and_wait)
-        .def("read", &frontend::read)
-        .def("latest", [](frontend& fe) { return fe.read(-1); })
+        .def("burst",
+             &frontend::burst,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
+        .def("final_burst",
+             &frontend::final_burst,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
+        .def("pulse_and_wait",
+             &frontend::pulse_and_wait,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
+        .def("read",
+             &frontend::read,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
+        .def("latest",
+             [](frontend& fe) { return fe.read(-1); },
+             pybind11::call_guard<pybind11::gil_scoped_release>())
         .def("pulse",
              (observation(frontend::*)(o80::Iteration)) & frontend::pulse)
         .def("pulse", (observation(frontend::*)()) & frontend::pulse)
@@ -385,6 +829,42 @@ void add_frontend(pybind11::module& m)
                                     mode);
                  }
              });
+    py_frontend.def(
+        "add_commands",
+        [](frontend& fe,
+           const IntArray& pressures,
+           const LongArray& durations_or_iterations,
+           o80::Mode mode,
+           bool iterations)
+        {
+            // pressures: (nb waypoints, NB_DOFS, 2) array of
+            // agonist / antagonist pressures
+            pybind11::ssize_t nb_waypoints =
+                pressures.ndim() > 0 ? pressures.shape(0) : 0;
+            check_shape(pressures, {nb_waypoints, NB_DOFS, 2}, "pressures");
+            const int* values = pressures.data();
+            add_trajectory(
+                [&fe, values](pybind11::ssize_t index, auto until, o80::Mode m)
+                {
+                    const int* waypoint = values + index * 2 * NB_DOFS;
+                    for (uint actuator = 0; actuator < 2 * NB_DOFS; actuator++)
+                    {
+                        fe.add_command(actuator,
+                                       o80_pam::ActuatorState(waypoint[actuator]),
+                                       until,
+                                       m);
+                    }
+                },
+                nb_waypoints,
+                durations_or_iterations,
+                mode,
+                iterations);
+        },
+        pybind11::arg("pressures"),
+        pybind11::arg("durations_or_iterations"),
+        pybind11::arg("mode"),
+        pybind11::arg("iterations") = false);
+    add_records_getters<PamRecord, observation>(py_frontend);
 }
 
 // add the bindings to o80::Observation corresponding to ball, targets,
@@ -393,7 +873,9 @@ void add_mirror_free_joint_observation_and_serializer(pybind11::module& m)
 {
     typedef o80::Observation<6, o80::State1d, o80::VoidExtendedState>
         observation;
-    pybind11::class_<observation>(m, "MirrorFreeJointObservation")
+    pybind11::class_<observation> py_observation(m, "MirrorFreeJointObservation");
+    add_bytes_conversion(py_observation);
+    py_observation
         .def(pybind11::init<>())
         .def("get_position",
              [](const observation& o)
@@ -461,7 +943,8 @@ void add_mirror_free_joint_observation_and_serializer(pybind11::module& m)
              });
 
     typedef shared_memory::Serializer<observation> serializer;
-    pybind11::class_<serializer>(m, "MirrorFreeJointSerializer")
+    pybind11::class_<serializer> py_serializer(m, "MirrorFreeJointSerializer");
+    py_serializer
         .def(pybind11::init<>())
         .def("serializable_size", &serializer::serializable_size)
         .def("serialize",
@@ -480,32 +963,55 @@ void add_mirror_free_joint_observation_and_serializer(pybind11::module& m)
                  s.deserialize(serialized, o);
                  return o;
              });
+    add_bulk_serialization<observation>(py_serializer);
 }
 
 // add the bindings to o80::FrontEnd
-// (with extra functions compared to the native o80 wrappers)
-void add_mirror_free_joint_frontend(pybind11::module& m)
+// (with extra functions compared to the native o80 wrappers),
+// the name of the python class being "MirrorFreeJointFrontEnd" + suffix
+template <int queue_size>
+void add_mirror_free_joint_frontend(pybind11::module& m,
+                                    const std::string& suffix = "")
 {
     typedef o80::Observation<6, o80::State1d, o80::VoidExtendedState>
         observation;
-    typedef o80::FrontEnd<QUEUE_SIZE, 6, o80::State1d, o80::VoidExtendedState>
+    typedef o80::FrontEnd<queue_size, 6, o80::State1d, o80::VoidExtendedState>
         frontend;
-    pybind11::class_<frontend>(m, "MirrorFreeJointFrontEnd")
+    pybind11::class_<frontend> py_frontend(
+        m, ("MirrorFreeJointFrontEnd" + suffix).c_str());
+    py_frontend
         // generic frontend bindings (similar to what o80::pybind11_helper.hpp
-        // creates)
+        // creates). The GIL is released during the calls that may block
+        // or copy from the shared memory
         .def(pybind11::init<std::string>())
         .def("get_nb_actuators", &frontend::get_nb_actuators)
-        .def("get_observations_since", &frontend::get_observations_since)
-        .def("get_latest_observations", &frontend::get_latest_observations)
-        .def("wait_for_next", &frontend::wait_for_next)
+        .def("get_observations_since",
+             &frontend::get_observations_since,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
+        .def("get_latest_observations",
+             &frontend::get_latest_observations,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
+        .def("wait_for_next",
+             &frontend::wait_for_next,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
         .def("reset_next_index", &frontend::reset_next_index)
         .def("initial_states", &frontend::initial_states)
-        .def("burst", &frontend::burst)
+        .def("burst",
+             &frontend::burst,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
         .def("purge", &frontend::purge)
-        .def("final_burst", &frontend::final_burst)
-        .def("pulse_and_wait", &frontend::pulse_and_wait)
-        .def("read", &frontend::read)
-        .def("latest", [](frontend& fe) { return fe.read(-1); })
+        .def("final_burst",
+             &frontend::final_burst,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
+        .def("pulse_and_wait",
+             &frontend::pulse_and_wait,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
+        .def("read",
+             &frontend::read,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
+        .def("latest",
+             [](frontend& fe) { return fe.read(-1); },
+             pybind11::call_guard<pybind11::gil_scoped_release>())
         .def("pulse",
              (observation(frontend::*)(o80::Iteration)) & frontend::pulse)
         .def("pulse", (observation(frontend::*)()) & frontend::pulse)
@@ -572,6 +1078,46 @@ void add_mirror_free_joint_frontend(pybind11::module& m)
                          2 * dim + 1, o80::State1d(velocity[dim]), mode);
                  }
              });
+    py_frontend.def(
+        "add_commands",
+        [](frontend& fe,
+           const DoubleArray& positions,
+           const DoubleArray& velocities,
+           const LongArray& durations_or_iterations,
+           o80::Mode mode,
+           bool iterations)
+        {
+            // positions and velocities: (nb waypoints, 3) arrays
+            pybind11::ssize_t nb_waypoints =
+                positions.ndim() > 0 ? positions.shape(0) : 0;
+            check_shape(positions, {nb_waypoints, 3}, "positions");
+            check_shape(velocities, {nb_waypoints, 3}, "velocities");
+            const double* p = positions.data();
+            const double* v = velocities.data();
+            add_trajectory(
+                [&fe, p, v](pybind11::ssize_t index, auto until, o80::Mode m)
+                {
+                    for (uint dim = 0; dim < 3; dim++)
+                    {
+                        fe.add_command(
+                            2 * dim, o80::State1d(p[index * 3 + dim]), until, m);
+                        fe.add_command(2 * dim + 1,
+                                       o80::State1d(v[index * 3 + dim]),
+                                       until,
+                                       m);
+                    }
+                },
+                nb_waypoints,
+                durations_or_iterations,
+                mode,
+                iterations);
+        },
+        pybind11::arg("positions"),
+        pybind11::arg("velocities"),
+        pybind11::arg("durations_or_iterations"),
+        pybind11::arg("mode"),
+        pybind11::arg("iterations") = false);
+    add_records_getters<MirrorFreeJointRecord, observation>(py_frontend);
 }
 
 // add the bindings to o80::Observation corresponding robot mirroring,
@@ -591,7 +1137,9 @@ void add_mirror_robot_observation_and_serializer(pybind11::module& m)
     typedef o80::
         Observation<NB_DOFS, o80::State2d, o80_pam::RobotFKExtendedState>
             observation;
-    pybind11::class_<observation>(m, "MirrorRobotObservation")
+    pybind11::class_<observation> py_observation(m, "MirrorRobotObservation");
+    add_bytes_conversion(py_observation);
+    py_observation
         .def(pybind11::init<>())
         .def("get_positions",
              [](const observation& o)
@@ -670,7 +1218,8 @@ void add_mirror_robot_observation_and_serializer(pybind11::module& m)
              });
 
     typedef shared_memory::Serializer<observation> serializer;
-    pybind11::class_<serializer>(m, "MirrorRobotSerializer")
+    pybind11::class_<serializer> py_serializer(m, "MirrorRobotSerializer");
+    py_serializer
         .def(pybind11::init<>())
         .def("serializable_size", &serializer::serializable_size)
         .def("serialize",
@@ -689,36 +1238,59 @@ void add_mirror_robot_observation_and_serializer(pybind11::module& m)
                  s.deserialize(serialized, o);
                  return o;
              });
+    add_bulk_serialization<observation>(py_serializer);
 }
 
 // add the bindings to o80::FrontEnd
-// (with extra functions compared to the native o80 wrappers)
-void add_mirror_robot_frontend(pybind11::module& m)
+// (with extra functions compared to the native o80 wrappers),
+// the name of the python class being "MirrorRobotFrontEnd" + suffix
+template <int queue_size>
+void add_mirror_robot_frontend(pybind11::module& m,
+                               const std::string& suffix = "")
 {
     typedef o80::
         Observation<NB_DOFS, o80::State2d, o80_pam::RobotFKExtendedState>
             observation;
-    typedef o80::FrontEnd<QUEUE_SIZE,
+    typedef o80::FrontEnd<queue_size,
                           NB_DOFS,
                           o80::State2d,
                           o80_pam::RobotFKExtendedState>
         frontend;
-    pybind11::class_<frontend>(m, "MirrorRobotFrontEnd")
+    pybind11::class_<frontend> py_frontend(
+        m, ("MirrorRobotFrontEnd" + suffix).c_str());
+    py_frontend
         // generic frontend bindings (similar to what o80::pybind11_helper.hpp
-        // creates)
+        // creates). The GIL is released during the calls that may block
+        // or copy from the shared memory
         .def(pybind11::init<std::string>())
         .def("get_nb_actuators", &frontend::get_nb_actuators)
-        .def("get_observations_since", &frontend::get_observations_since)
-        .def("get_latest_observations", &frontend::get_latest_observations)
-        .def("wait_for_next", &frontend::wait_for_next)
+        .def("get_observations_since",
+             &frontend::get_observations_since,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
+        .def("get_latest_observations",
+             &frontend::get_latest_observations,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
+        .def("wait_for_next",
+             &frontend::wait_for_next,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
         .def("reset_next_index", &frontend::reset_next_index)
         .def("initial_states", &frontend::initial_states)
-        .def("burst", &frontend::burst)
+        .def("burst",
+             &frontend::burst,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
         .def("purge", &frontend::purge)
-        .def("final_burst", &frontend::final_burst)
-        .def("pulse_and_wait", &frontend::pulse_and_wait)
-        .def("read", &frontend::read)
-        .def("latest", [](frontend& fe) { return fe.read(-1); })
+        .def("final_burst",
+             &frontend::final_burst,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
+        .def("pulse_and_wait",
+             &frontend::pulse_and_wait,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
+        .def("read",
+             &frontend::read,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
+        .def("latest",
+             [](frontend& fe) { return fe.read(-1); },
+             pybind11::call_guard<pybind11::gil_scoped_release>())
         .def("pulse",
              (observation(frontend::*)(o80::Iteration)) & frontend::pulse)
         .def("pulse", (observation(frontend::*)()) & frontend::pulse)
@@ -781,6 +1353,45 @@ void add_mirror_robot_frontend(pybind11::module& m)
                          dof, o80::State2d(position[dof], velocity[dof]), mode);
                  }
              });
+    py_frontend.def(
+        "add_commands",
+        [](frontend& fe,
+           const DoubleArray& positions,
+           const DoubleArray& velocities,
+           const LongArray& durations_or_iterations,
+           o80::Mode mode,
+           bool iterations)
+        {
+            // positions and velocities: (nb waypoints, NB_DOFS) arrays
+            pybind11::ssize_t nb_waypoints =
+                positions.ndim() > 0 ? positions.shape(0) : 0;
+            check_shape(positions, {nb_waypoints, NB_DOFS}, "positions");
+            check_shape(velocities, {nb_waypoints, NB_DOFS}, "velocities");
+            const double* p = positions.data();
+            const double* v = velocities.data();
+            add_trajectory(
+                [&fe, p, v](pybind11::ssize_t index, auto until, o80::Mode m)
+                {
+                    for (uint dof = 0; dof < NB_DOFS; dof++)
+                    {
+                        fe.add_command(dof,
+                                       o80::State2d(p[index * NB_DOFS + dof],
+                                                    v[index * NB_DOFS + dof]),
+                                       until,
+                                       m);
+                    }
+                },
+                nb_waypoints,
+                durations_or_iterations,
+                mode,
+                iterations);
+        },
+        pybind11::arg("positions"),
+        pybind11::arg("velocities"),
+        pybind11::arg("durations_or_iterations"),
+        pybind11::arg("mode"),
+        pybind11::arg("iterations") = false);
+    add_records_getters<MirrorRobotRecord, observation>(py_frontend);
 }
 
 PYBIND11_MODULE(o80_pam_wrp, m)
@@ -797,8 +1408,75 @@ PYBIND11_MODULE(o80_pam_wrp, m)
         o80::NO_SERIALIZER>      // added below
         (m);
 
+    // dtypes of the numpy arrays returned by the
+    // get_observations_since_array and get_latest_observations_array
+    // methods of the frontends
+    PYBIND11_NUMPY_DTYPE(PamRecord,
+                         iteration,
+                         time_stamp,
+                         frequency,
+                         positions,
+                         velocities,
+                         desired_pressures,
+                         observed_pressures,
+                         references_found);
+    PYBIND11_NUMPY_DTYPE(MirrorRobotRecord,
+                         iteration,
+                         time_stamp,
+                         frequency,
+                         positions,
+                         velocities,
+                         cartesian_position,
+                         cartesian_orientation);
+    PYBIND11_NUMPY_DTYPE(MirrorFreeJointRecord,
+                         iteration,
+                         time_stamp,
+                         frequency,
+                         position,
+                         velocity);
+
     add_observation_and_serializer(m);
-    add_frontend(m);
+    add_frontend<QUEUE_SIZE>(m);
+    add_frontend<SMALL_QUEUE_SIZE>(m, "_small");
+
+    // same as o80_pam.observation_convertors.observations_to_numpy
+    // (without the column names)
+    m.def("observations_to_array",
+          [](const std::vector<PamObservation>& observations)
+          {
+              pybind11::array_t<double> array(
+                  {observations.size(),
+                   static_cast<std::size_t>(OBSERVATION_ARRAY_SIZE)});
+              double* values = array.mutable_data();
+              {
+                  pybind11::gil_scoped_release release;
+                  for (std::size_t index = 0; index < observations.size();
+                       index++)
+                  {
+                      observation_to_array(
+                          observations[index],
+                          values + index * OBSERVATION_ARRAY_SIZE);
+                  }
+              }
+              return array;
+          });
+
+    // same as o80_pam.log_columnar.observations_to_records
+    m.def("observations_to_records",
+          [](const std::vector<PamObservation>& observations)
+          {
+              pybind11::array_t<PamRecord> records(observations.size());
+              PamRecord* data = records.mutable_data();
+              {
+                  pybind11::gil_scoped_release release;
+                  for (std::size_t index = 0; index < observations.size();
+                       index++)
+                  {
+                      to_record(observations[index], data[index]);
+                  }
+              }
+              return records;
+          });
 
     // wrappers for dummy robot
     std::string prefix_dummy("dummy_");
@@ -807,6 +1485,14 @@ PYBIND11_MODULE(o80_pam_wrp, m)
         DummyStandalone,
         pam_interface::Configuration<NB_DOFS>>(m, prefix_dummy);
 
+    // wrappers for dummy robot, small queue size
+    // (to be used with FrontEnd_small)
+    std::string prefix_dummy_small("dummy_small_");
+    o80::create_standalone_python_bindings<
+        DummyDriver,
+        DummySmallStandalone,
+        pam_interface::Configuration<NB_DOFS>>(m, prefix_dummy_small);
+
     // wrappers for pamy1 robot
     std::string prefix_pamy1("pamy1_");
     o80::create_standalone_python_bindings<
@@ -836,7 +1522,7 @@ PYBIND11_MODULE(o80_pam_wrp, m)
                                 o80::NO_SERIALIZER,      // added below
                                 o80::NO_FRONTEND>        // added below
         (m, std::string("MirrorRobot"));
-    add_mirror_robot_frontend(m);
+    add_mirror_robot_frontend<QUEUE_SIZE>(m);
     add_mirror_robot_observation_and_serializer(m);
 
     // extra o80 wrappers for exchange of information regarding
@@ -855,5 +1541,5 @@ PYBIND11_MODULE(o80_pam_wrp, m)
                                 o80::NO_FRONTEND>  // added below
         (m, std::string("MirrorFreeJoint"));
     add_mirror_free_joint_observation_and_serializer(m);
-    add_mirror_free_joint_frontend(m);
+    add_mirror_free_joint_frontend<QUEUE_SIZE>(m);
 }
@@ -0,0 +1,31 @@
+# helpers shared by the unit tests of the loggers and of the frontends
+
+import o80_pam
+import pam_interface
+from o80_pam.observation_convertors import dict_to_observation
+
+
+def _observation(iteration):
+    return dict_to_observation(
+        {
+            "iteration": iteration,
+            "frequency": 500.0,
+            "time_stamp": iteration * 2000000,
+            "positions": [0.1 * iteration, 2.0, 3.0, 4.0],
+            "velocities": [10.0, 20.0, 30.0, 40.0 * iteration],
+            "desired_pressures": [iteration, -10, 20, -20, 30, -30, 40, -40],
+            "observed_pressures": [11, -11, 21, -21, 31, -31, 41, -iteration],
+            "references_found": [True, iteration % 2 == 0, False, True],
+        }
+    )
+
+
+_segment_id = "logger_unit_tests"
+
+
+def _dummy_robot(frequency=100, small_queue=False):
+    # context manager running a dummy robot on the segment _segment_id
+    pam_config = pam_interface.Pamy2DefaultConfiguration.get_path(True)
+    return o80_pam.run_dummy_robot(
+        _segment_id, frequency, False, pam_config, small_queue=small_queue
+    )
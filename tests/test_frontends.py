@@ -0,0 +1,155 @@
+import unittest
+import os
+import o80
+import o80_pam
+import tempfile
+import pickle
+import time
+import asyncio
+import threading
+import numpy as np
+from o80_pam import log_columnar
+from _helpers import _observation, _segment_id, _dummy_robot
+
+
+class O80_PAM_FRONTENDS_TESTCASE(unittest.TestCase):
+    def test_bulk_serialization(self):
+        serializer = o80_pam.Serializer()
+        size = serializer.serializable_size()
+        observations = [_observation(it) for it in range(10)]
+        serialized = serializer.serialize_many(observations)
+        self.assertEqual(
+            serialized, b"".join([serializer.serialize(obs) for obs in observations])
+        )
+        buffer = bytearray(len(serialized) + size // 2)
+        self.assertEqual(
+            serializer.serialize_into(observations, buffer), len(serialized)
+        )
+        # the incomplete record at the end of the buffer is ignored
+        deserialized = serializer.deserialize_many(buffer)
+        self.assertEqual([obs.get_iteration() for obs in deserialized], list(range(10)))
+        with self.assertRaises(ValueError):
+            serializer.serialize_into(observations, bytearray(size))
+
+    def test_observations_array(self):
+        with _dummy_robot():
+            frontend = o80_pam.FrontEnd(_segment_id)
+            time.sleep(0.2)
+            records = frontend.get_latest_observations_array(10)
+            observations = frontend.get_observations_since(int(records["iteration"][0]))
+            since = frontend.get_observations_since_array(int(records["iteration"][0]))
+        self.assertEqual(len(records), 10)
+        # same schema (fields, offsets and size) as the columnar log files
+        self.assertEqual(records.dtype, log_columnar.record_dtype)
+        for record, obs in zip(since, observations):
+            self.assertEqual(record["iteration"], obs.get_iteration())
+            self.assertEqual(record["time_stamp"], obs.get_time_stamp())
+            self.assertEqual(list(record["positions"]), list(obs.get_positions()))
+            self.assertEqual(
+                list(record["observed_pressures"]),
+                list(np.ravel(obs.get_observed_pressures())),
+            )
+
+    def test_observation_pickle(self):
+        serializer = o80_pam.Serializer()
+        observation = _observation(3)
+        serialized = bytes(observation)
+        self.assertEqual(serialized, serializer.serialize(observation))
+        for obs in (
+            pickle.loads(pickle.dumps(observation)),
+            o80_pam.Observation.from_bytes(memoryview(serialized)),
+        ):
+            self.assertEqual(bytes(obs), serialized)
+            self.assertEqual(obs.get_iteration(), 3)
+
+    def test_add_commands(self):
+        with _dummy_robot(500):
+            frontend = o80_pam.FrontEnd(_segment_id)
+            pressures = np.zeros((3, 4, 2), dtype=np.int32)
+            pressures[:, :, 0] = [[15000] * 4, [16000] * 4, [17000] * 4]
+            pressures[:, :, 1] = 18000
+            frontend.add_commands(pressures, np.array([100000] * 3), o80.Mode.OVERWRITE)
+            frontend.pulse_and_wait()
+            desired = frontend.latest().get_desired_pressures()
+            with self.assertRaises(ValueError):
+                frontend.add_commands(
+                    np.zeros((3, 4), dtype=np.int32),
+                    np.array([1000] * 3),
+                    o80.Mode.QUEUE,
+                )
+        self.assertEqual(desired, [(17000, 18000)] * 4)
+
+    def test_gil_released(self):
+        with _dummy_robot(500):
+            frontend = o80_pam.FrontEnd(_segment_id)
+            frontend.add_command(
+                0, 16000, 16000, o80.Duration_us.seconds(1), o80.Mode.OVERWRITE
+            )
+            waiting = threading.Thread(target=frontend.pulse_and_wait)
+            waiting.start()
+            # the python thread keeps running while the other
+            # thread blocks in pulse_and_wait
+            nb_passes = 0
+            while waiting.is_alive():
+                nb_passes += 1
+                time.sleep(0.001)
+            waiting.join()
+        self.assertGreater(nb_passes, 100)
+
+    def test_aio(self):
+
+        async def _run():
+            async with o80_pam.aio.FrontEnd(_segment_id) as frontend:
+                frontend.add_command(
+                    0,
+                    16000,
+                    16000,
+                    o80.Duration_us.milliseconds(300),
+                    o80.Mode.OVERWRITE,
+                )
+                ticks = 0
+
+                async def _tick():
+                    nonlocal ticks
+                    while True:
+                        ticks += 1
+                        await asyncio.sleep(0.001)
+
+                # the event loop keeps running while waiting
+                ticking = asyncio.ensure_future(_tick())
+                await frontend.pulse_and_wait()
+                ticking.cancel()
+                latest = await frontend.latest()
+                observations = await frontend.get_observations_since(
+                    latest.get_iteration() - 10
+                )
+                return ticks, latest, observations
+
+        with _dummy_robot(500):
+            ticks, latest, observations = asyncio.run(_run())
+        self.assertGreater(ticks, 50)
+        self.assertEqual(latest.get_desired_pressures()[0], (16000, 16000))
+        self.assertGreater(len(observations), 0)
+
+    def test_small_queue(self):
+        with _dummy_robot(500, small_queue=True):
+            frontend = o80_pam.FrontEnd_small(_segment_id)
+            time.sleep(0.1)
+            iteration = frontend.latest().get_iteration()
+            time.sleep(0.1)
+            self.assertGreater(frontend.latest().get_iteration(), iteration)
+            with tempfile.TemporaryDirectory() as tmp:
+                log_path = os.path.join(tmp, "small")
+                with o80_pam.Logger(
+                    _segment_id, log_path, frontend_class=o80_pam.FrontEnd_small
+                ):
+                    time.sleep(0.5)
+                self.assertGreater(len(list(o80_pam.read_file(log_path))), 5)
+
+            async def _latest():
+                async with o80_pam.aio.FrontEnd(
+                    _segment_id, frontend_class=o80_pam.FrontEnd_small
+                ) as async_frontend:
+                    return await async_frontend.latest()
+
+            self.assertGreater(asyncio.run(_latest()).get_iteration(), iteration)
@@ -0,0 +1,57 @@
+import sys
+import subprocess
+import unittest
+
+# modules that "import o80_pam" should not import
+# (see the lazy imports in o80_pam/__init__.py)
+_heavy_modules = (
+    "pandas",
+    "context",
+    "lightargs",
+    "signal_handler",
+    "o80_pam.logger",
+    "o80_pam.multi_logger",
+    "o80_pam.log_columnar",
+)
+
+# upper bound of the duration of "import o80_pam" (seconds), not counting
+# the import of the modules it can not avoid (i.e. the bindings and their
+# dependencies, imported beforehand, see test_import_duration)
+_max_import_overhead = 0.1
+
+
+def _run(code: str) -> str:
+    # running in a new interpreter, so that the modules already
+    # imported by the test runner do not interfere
+    return subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout
+
+
+class O80_PAM_IMPORT_TIME_TESTCASE(unittest.TestCase):
+    def test_heavy_modules_not_imported(self):
+        output = _run(
+            "import sys, o80_pam; "
+            "print(' '.join([m for m in {} if m in sys.modules]))".format(
+                _heavy_modules
+            )
+        )
+        self.assertEqual(output.strip(), "")
+
+    def test_import_duration(self):
+        output = _run(
+            "import time, numpy, o80, shared_memory, o80_pam_wrp; "
+            "start = time.perf_counter(); import o80_pam; "
+            "print(time.perf_counter() - start)"
+        )
+        self.assertLess(float(output), _max_import_overhead)
+
+    def test_lazy_attributes(self):
+        output = _run(
+            "import sys, o80_pam; "
+            "o80_pam.observation_convertors.observations_to_numpy; "
+            "o80_pam.ObservationView; "
+            "o80_pam.Logger; "
+            "print('pandas' in sys.modules, 'o80_pam.logger' in sys.modules)"
+        )
+        self.assertEqual(output.strip(), "True True")
@@ -1,9 +1,14 @@
 import unittest
 import os
 import o80_pam
-import pam_interface
 import tempfile
 import time
+import asyncio
+import threading
+import numpy as np
+from o80_pam import log_columnar, log_compression, log_index, multi_logger
+from o80_pam.logger import _CompressedFormat, _Follower
+from _helpers import _observation, _segment_id, _dummy_robot
 
 
 class O80_PAM_LOGGER_TESTCASE(unittest.TestCase):
@@ -42,19 +47,372 @@ class O80_PAM_LOGGER_TESTCASE(unittest.TestCase):
             )
 
     def test_logger_ok(self):
-        pam_config = pam_interface.Pamy2DefaultConfiguration.get_path(True)
-        frequency = 100
-        bursting_mode = False
-        segment_id = "logger_unit_tests"
         with tempfile.TemporaryDirectory() as tmp:
             log_path = os.path.join(tmp, "logger_ut")
-            with o80_pam.run_dummy_robot(
-                segment_id, frequency, bursting_mode, pam_config
-            ):
-                with o80_pam.Logger(segment_id, log_path) as logger:
+            with _dummy_robot():
+                with o80_pam.Logger(_segment_id, log_path) as logger:
                     time.sleep(1.0)
             observations = list(o80_pam.read_file(log_path))
             self.assertGreater(len(observations), 5)
         for o1, o2 in zip(observations, observations[1:]):
             self.assertGreater(o2.get_time_stamp(), o1.get_time_stamp())
             self.assertEqual(o1.get_iteration(), o2.get_iteration() - 1)
+
+    def test_logger_buffered(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log_path = os.path.join(tmp, "logger_ut")
+            with _dummy_robot():
+                with o80_pam.Logger(
+                    _segment_id, log_path, buffered=True, flush_period=0.1
+                ) as logger:
+                    time.sleep(1.0)
+            observations = list(o80_pam.read_file(log_path))
+            self.assertGreater(len(observations), 5)
+            self.assertGreater(logger.write_throughput(), 0)
+            stats = logger.stats()
+            self.assertEqual(stats["observations"], len(observations))
+            self.assertEqual(stats["missed_iterations"], 0)
+            self.assertEqual(stats["bytes"], os.path.getsize(log_path))
+        for o1, o2 in zip(observations, observations[1:]):
+            self.assertEqual(o1.get_iteration(), o2.get_iteration() - 1)
+
+    def test_columnar_format(self):
+        observations = [_observation(it) for it in range(10, 20)]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "columnar")
+            with open(path, "wb") as f:
+                f.write(log_columnar.header())
+                f.write(log_columnar.observations_to_records(observations).tobytes())
+            records = o80_pam.read_file_mmap(path)
+            self.assertEqual(len(records), len(observations))
+            for record, obs in zip(records, observations):
+                self.assertEqual(record["iteration"], obs.get_iteration())
+                self.assertEqual(record["time_stamp"], obs.get_time_stamp())
+                self.assertEqual(list(record["positions"]), list(obs.get_positions()))
+                self.assertEqual(
+                    list(record["observed_pressures"]),
+                    list(np.ravel(obs.get_observed_pressures())),
+                )
+                self.assertEqual(
+                    list(record["references_found"]),
+                    list(obs.get_references_found()),
+                )
+            del records
+            # not readable as a native file
+            with self.assertRaises(ValueError):
+                list(o80_pam.read_file(path))
+            with self.assertRaises(ValueError):
+                list(o80_pam.read_range(path, 12))
+        with self.assertRaises(ValueError):
+            o80_pam.Logger("ut", path, file_format="columnar", segment_size=1024 * 1024)
+
+    def test_random_access(self):
+        # iterations 0 to 99, except 40 to 49 (missed by the logger)
+        iterations = [it for it in range(100) if not 40 <= it < 50]
+        serializer = o80_pam.Serializer()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "native")
+            with open(path, "wb") as f:
+                for it in iterations:
+                    f.write(serializer.serialize(_observation(it)))
+            observations = list(o80_pam.read_range(path, 20, 30))
+            self.assertEqual(
+                [o.get_iteration() for o in observations], list(range(20, 30))
+            )
+            observations = list(o80_pam.read_range(path, 45, 55))
+            self.assertEqual(
+                [o.get_iteration() for o in observations], list(range(50, 55))
+            )
+            observations = list(o80_pam.read_range(path, start_iteration=95))
+            self.assertEqual(len(observations), 5)
+            # time stamps are iteration * 2ms (see _observation)
+            observations = list(
+                o80_pam.read_time_window(path, 60 * 2000000, 70 * 2000000)
+            )
+            self.assertEqual(
+                [o.get_iteration() for o in observations], list(range(60, 70))
+            )
+
+    def test_logger_segments(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log_path = os.path.join(tmp, "logger_ut")
+            with _dummy_robot():
+                with o80_pam.Logger(_segment_id, log_path, segment_duration=0.3):
+                    time.sleep(1.0)
+            self.assertFalse(os.path.exists(log_path))
+            self.assertGreater(len(o80_pam.list_segments(log_path)), 1)
+            observations = list(o80_pam.read_file(log_path))
+            self.assertGreater(len(observations), 5)
+        # no observation lost between segments
+        for o1, o2 in zip(observations, observations[1:]):
+            self.assertEqual(o1.get_iteration(), o2.get_iteration() - 1)
+
+    def test_compression(self):
+        observations = [_observation(it) for it in range(100)]
+        for codec in log_compression.codecs.keys():
+            file_format = _CompressedFormat(codec, 16)
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "compressed")
+                with open(path, "wb") as f:
+                    f.write(file_format.header())
+                    for start in range(0, 100, 30):
+                        f.write(
+                            b"".join(
+                                file_format.encode(observations[start : start + 30])
+                            )
+                        )
+                    f.write(b"".join(file_format.finish()))
+                blocks = log_compression.read_block_index(path)
+                self.assertEqual(len(blocks), 7)
+                read = list(o80_pam.read_file(path))
+                self.assertEqual([o.get_iteration() for o in read], list(range(100)))
+                self.assertEqual(
+                    read[50].get_positions(), observations[50].get_positions()
+                )
+                read = list(o80_pam.read_range(path, 40, 45))
+                self.assertEqual([o.get_iteration() for o in read], list(range(40, 45)))
+                # without index (file not closed properly): index rebuilt
+                # from the block headers
+                with open(path, "r+b") as f:
+                    f.truncate(blocks[-1].offset)
+                blocks = log_compression.read_block_index(path)
+                self.assertEqual(len(blocks), 6)
+                self.assertEqual(len(list(o80_pam.read_file(path))), 96)
+
+    def test_multi_logger(self):
+        streams = [(_segment_id, o80_pam.FrontEnd)]
+        with tempfile.TemporaryDirectory() as tmp:
+            interleaved_path = os.path.join(tmp, "interleaved")
+            aligned_path = os.path.join(tmp, "aligned")
+            with _dummy_robot():
+                with o80_pam.MultiLogger(streams, interleaved_path, interleaved=True):
+                    time.sleep(0.5)
+                with o80_pam.MultiLogger(streams, aligned_path):
+                    time.sleep(0.5)
+            entries = list(o80_pam.read_multi_file(interleaved_path))
+            self.assertGreater(len(entries), 5)
+            self.assertTrue(all([entry[0] == _segment_id for entry in entries]))
+            observations = list(
+                o80_pam.read_file(
+                    o80_pam.multi_logger.stream_path(aligned_path, _segment_id)
+                )
+            )
+            self.assertGreater(len(observations), 5)
+            passes = list(o80_pam.read_passes(aligned_path))
+            self.assertEqual(
+                passes[-1][1][_segment_id], observations[-1].get_iteration()
+            )
+        for e1, e2 in zip(entries, entries[1:]):
+            self.assertEqual(e1[2].get_iteration(), e2[2].get_iteration() - 1)
+            self.assertGreaterEqual(e2[1], e1[1])
+
+    def test_logger_threaded(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log_path = os.path.join(tmp, "logger_ut")
+            with _dummy_robot():
+                with o80_pam.Logger(_segment_id, log_path, threaded=True) as logger:
+                    time.sleep(1.0)
+            observations = list(o80_pam.read_file(log_path))
+            self.assertGreater(len(observations), 5)
+            stats = logger.stats()
+            self.assertEqual(stats["dropped"], 0)
+            self.assertEqual(stats["observations"], len(observations))
+        for o1, o2 in zip(observations, observations[1:]):
+            self.assertEqual(o1.get_iteration(), o2.get_iteration() - 1)
+
+    def test_observation_view_partial_record(self):
+        serializer = o80_pam.Serializer()
+        serialized = [serializer.serialize(_observation(it)) for it in range(5)]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "native")
+            with open(path, "wb") as f:
+                f.write(b"".join(serialized[:3]) + serialized[3][:10])
+            views = o80_pam.read_file_views(path, chunk_size=2)
+            iterations = [next(views).get_iteration() for _ in range(3)]
+            self.assertEqual(iterations, [0, 1, 2])
+            # the file is completed while being read: the reading stops
+            # at the incomplete record rather than reading unaligned bytes
+            with open(path, "ab") as f:
+                f.write(serialized[3][10:] + serialized[4])
+            self.assertEqual(list(views), [])
+
+    def test_observation_view(self):
+        serializer = o80_pam.Serializer()
+        observations = [_observation(it) for it in range(5)]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "native")
+            with open(path, "wb") as f:
+                for obs in observations:
+                    f.write(serializer.serialize(obs))
+            views = list(o80_pam.read_file_views(path, chunk_size=2))
+            self.assertEqual(len(views), len(observations))
+            for view, obs in zip(views, observations):
+                for getter in (
+                    "get_iteration",
+                    "get_time_stamp",
+                    "get_frequency",
+                    "get_positions",
+                    "get_velocities",
+                    "get_desired_pressures",
+                    "get_observed_pressures",
+                    "get_references_found",
+                ):
+                    self.assertEqual(
+                        list(np.ravel(getattr(view, getter)())),
+                        list(np.ravel(getattr(obs, getter)())),
+                    )
+
+    def test_sidecar_index(self):
+        serializer = o80_pam.Serializer()
+        iterations = [0, 1, 2, 5, 6]
+        with tempfile.TemporaryDirectory() as tmp:
+            manager = o80_pam.FileManager(tmp, "ut_")
+            path = manager.next()
+            with open(path, "wb") as f:
+                for it in iterations:
+                    f.write(serializer.serialize(_observation(it)))
+            files = manager.list_files()
+            self.assertEqual(len(files), 1)
+            self.assertEqual(files[0].num, 1)
+            # no sidecar index file: built from the file
+            index = manager.index(files[0])
+            self.assertTrue(os.path.isfile(log_index.sidecar_path(path)))
+            self.assertEqual(index["nb_records"], 5)
+            self.assertEqual(index["nb_gaps"], 1)
+            self.assertEqual(index["first_iteration"], 0)
+            self.assertEqual(index["last_iteration"], 6)
+            self.assertEqual(index["last_time_stamp"], 6 * 2000000)
+            # sidecar index files are not listed
+            self.assertEqual(len(manager.list_files()), 1)
+            self.assertEqual(len(manager.files_in_time_range(0, 1)), 1)
+            self.assertEqual(
+                len(manager.files_in_time_range(7 * 2000000, 8 * 2000000)), 0
+            )
+
+    def test_file_manager_multi_logger(self):
+        serializer = o80_pam.Serializer()
+        with tempfile.TemporaryDirectory() as tmp:
+            manager = o80_pam.FileManager(tmp, "ut_")
+            path = manager.next()
+            # files written by a MultiLogger (interleaved=False)
+            for segment_id in ("real_robot", "ut"):
+                with open(multi_logger.stream_path(path, segment_id), "wb") as f:
+                    f.write(serializer.serialize(_observation(0)))
+            with open(multi_logger.passes_path(path), "wb") as f:
+                f.write(
+                    multi_logger._header(
+                        [("real_robot", "FrontEnd"), ("ut", "FrontEnd")]
+                    )
+                )
+            files = manager.list_files()
+            self.assertEqual(len(files), 1)
+            self.assertEqual(files[0].path, path)
+            self.assertEqual(files[0].num, 1)
+            self.assertEqual(sorted(files[0].streams), ["real_robot", "ut"])
+            self.assertEqual(files[0].passes, multi_logger.passes_path(path))
+            self.assertEqual(len(manager.files_in_time_range(0, 1)), 1)
+            self.assertTrue(manager.next().startswith(os.path.join(tmp, "ut_2_")))
+
+    def test_multi_logger_interleaved_not_native(self):
+        serializer = o80_pam.Serializer()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "interleaved")
+            with open(path, "wb") as f:
+                f.write(multi_logger._header([("ut", "FrontEnd")]))
+                f.write(serializer.serialize(_observation(0)))
+            self.assertTrue(multi_logger.is_multi_file(path))
+            with self.assertRaises(ValueError):
+                list(o80_pam.read_file(path))
+            with self.assertRaises(ValueError):
+                list(o80_pam.read_range(path, 0))
+
+    def test_follow(self):
+        serializer = o80_pam.Serializer()
+        nb_observations = 20
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "followed")
+            open(path, "wb").close()
+
+            def _write():
+                # records written in two parts, i.e. the reader
+                # may see partially written records
+                with open(path, "ab") as f:
+                    for it in range(nb_observations):
+                        serialized = serializer.serialize(_observation(it))
+                        f.write(serialized[:10])
+                        f.flush()
+                        time.sleep(0.005)
+                        f.write(serialized[10:])
+                        f.flush()
+
+            writer = threading.Thread(target=_write)
+            writer.start()
+            observations = list(o80_pam.read_file(path, follow=True, timeout=0.5))
+            writer.join()
+
+            async def _aread():
+                return [
+                    obs
+                    async for obs in o80_pam.aread_file(path, follow=True, timeout=0.1)
+                ]
+
+            async_observations = asyncio.run(_aread())
+        for obs in (observations, async_observations):
+            self.assertEqual(
+                [o.get_iteration() for o in obs], list(range(nb_observations))
+            )
+
+    def test_follow_segments(self):
+        serializer = o80_pam.Serializer()
+
+        def _write(path, iterations):
+            with open(path, "ab") as f:
+                for it in iterations:
+                    f.write(serializer.serialize(_observation(it)))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "segmented")
+            _write(o80_pam.logger.segment_path(path, 0), range(5))
+            follower = _Follower(path, serializer)
+            iterations = [obs.get_iteration() for obs in follower.poll()]
+            # rotation: the tail of the segment is written just before
+            # the creation of the next segment
+            _write(o80_pam.logger.segment_path(path, 0), range(5, 8))
+            _write(o80_pam.logger.segment_path(path, 1), range(8, 10))
+            # the first read of the next poll occurring just before the rotation
+            read, reads = follower._read, [b""]
+            follower._read = lambda: reads.pop() if reads else read()
+            observations = follower.poll()
+            while observations:
+                iterations.extend([obs.get_iteration() for obs in observations])
+                observations = follower.poll()
+            follower.close()
+        self.assertEqual(iterations, list(range(10)))
+
+    def test_logger_trigger(self):
+        pre_trigger, post_trigger = 0.2, 0.3
+        with tempfile.TemporaryDirectory() as tmp:
+            log_path = os.path.join(tmp, "logger_ut")
+            with _dummy_robot():
+                logger = o80_pam.Logger(
+                    _segment_id,
+                    log_path,
+                    pre_trigger=pre_trigger,
+                    post_trigger=post_trigger,
+                    trigger_id="logger_ut_trigger",
+                )
+                self.assertEqual(logger.trigger_id, "logger_ut_trigger")
+                with logger:
+                    time.sleep(1.0)
+                    # as could be done by another process
+                    o80_pam.fire_trigger(_segment_id, "logger_ut_trigger")
+                    time.sleep(1.0)
+                stats = logger.stats()
+            observations = list(o80_pam.read_file(log_path))
+        self.assertEqual(stats["triggers"], 1)
+        self.assertGreater(len(observations), 5)
+        # only the observations around the trigger are written
+        duration = observations[-1].get_time_stamp() - observations[0].get_time_stamp()
+        self.assertLess(duration, (pre_trigger + post_trigger + 0.1) * 1e9)
+        for o1, o2 in zip(observations, observations[1:]):
+            self.assertEqual(o1.get_iteration(), o2.get_iteration() - 1)
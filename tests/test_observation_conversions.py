@@ -1,6 +1,8 @@
 import unittest
 import tempfile
 from pathlib import Path
+import numpy as np
+import pandas as pd
 from o80_pam.observation_convertors import (
     dict_to_observation,
     observations_to_pandas,
@@ -10,6 +12,11 @@ from o80_pam.observation_convertors import (
     convert_native_file_to_pandas,
     read_pandas,
     observation_to_numpy,
+    read_file_parallel,
+    numpy_to_observations,
+    observation_dtype,
+    iter_native_file_chunks,
+    iter_pandas,
 )
 import o80_pam
 
@@ -83,3 +90,86 @@ class O80_PAM_OBSERVATION_CONVERTORS_TESTCASE(unittest.TestCase):
             d2 = numpy_to_dict(np2)
             self._compare(self.obs1, d1)
             self._compare(self.obs2, d2)
+
+    def test_read_file_parallel(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            native_path = Path(tmp) / "native"
+            observations = [
+                dict_to_observation(obs) for obs in [self.obs1, self.obs2] * 50
+            ]
+            serializer = o80_pam.Serializer()
+            with open(native_path, "wb+") as f:
+                for obs in observations:
+                    f.write(serializer.serialize(obs))
+            expected, columns = observations_to_numpy(o80_pam.read_file(native_path))
+            data, parallel_columns = read_file_parallel(native_path, workers=3)
+            self.assertEqual(list(columns), list(parallel_columns))
+            self.assertEqual(data.shape, expected.shape)
+            self.assertTrue((data == expected).all())
+
+    def test_to_array(self):
+        observations = [dict_to_observation(obs) for obs in (self.obs1, self.obs2)]
+        matrix = o80_pam.observations_to_array(observations)
+        self.assertEqual(matrix.shape, (2, 31))
+        for row, obs, obs_d in zip(matrix, observations, (self.obs1, self.obs2)):
+            self.assertEqual(list(row), list(obs.to_array()))
+            self._compare(obs_d, numpy_to_dict(row))
+        self.assertEqual(o80_pam.observations_to_array([]).shape, (0, 31))
+
+    def test_observations_to_numpy_generator(self):
+        observations = [
+            dict_to_observation(obs) for obs in (self.obs1, self.obs2, self.obs1)
+        ]
+        expected, _ = observations_to_numpy(observations)
+        for chunk_size in (1, 2, 10):
+            matrix, _ = observations_to_numpy(
+                (obs for obs in observations), chunk_size=chunk_size
+            )
+            self.assertEqual(matrix.shape, (3,))
+            self.assertEqual(matrix.tolist(), expected.tolist())
+        matrix, _ = observations_to_numpy(iter([]))
+        self.assertEqual(matrix.shape, (0,))
+
+    def test_typed_conversions(self):
+        obs = dict(self.obs1)
+        # not exactly representable as a float64
+        obs["time_stamp"] = 2**60 + 1
+        observations = [dict_to_observation(obs)]
+        array, columns = observations_to_numpy(observations)
+        self.assertEqual(array.dtype, observation_dtype)
+        self.assertEqual(array["time_stamp"][0], obs["time_stamp"])
+        dataframe = observations_to_pandas(observations)
+        self.assertEqual(list(dataframe.columns), list(columns))
+        self.assertEqual(dataframe["iteration"].dtype, np.int64)
+        self.assertEqual(dataframe["desired_pressure_0_ago"].dtype, np.int32)
+        self.assertEqual(dataframe["reference_found_0"].dtype, np.bool_)
+        for observation in (
+            numpy_to_observations(array)[0],
+            pandas_to_observations(dataframe)[0],
+        ):
+            self.assertEqual(observation.get_time_stamp(), obs["time_stamp"])
+            record = observations_to_numpy([observation])[0][0]
+            self._compare(obs, numpy_to_dict(record))
+
+    def test_chunked_conversion(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            native_path = Path(tmp) / "native"
+            pandas_path = Path(tmp) / "pandas"
+            legacy_path = Path(tmp) / "legacy"
+            observations = [
+                dict_to_observation(obs) for obs in [self.obs1, self.obs2] * 5
+            ]
+            serializer = o80_pam.Serializer()
+            with open(native_path, "wb+") as f:
+                for obs in observations:
+                    f.write(serializer.serialize(obs))
+            expected = observations_to_pandas(observations)
+            chunks = list(iter_native_file_chunks(native_path, chunk_size=3))
+            self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 3, 1])
+            self.assertTrue(pd.concat(chunks).equals(expected))
+            convert_native_file_to_pandas(native_path, pandas_path, chunk_size=3)
+            self.assertEqual(len(list(iter_pandas(pandas_path))), 4)
+            self.assertTrue(read_pandas(pandas_path).equals(expected))
+            # file pickled in a single piece
+            expected.to_pickle(str(legacy_path))
+            self.assertTrue(read_pandas(legacy_path).equals(expected))